@@ -1,13 +1,13 @@
 from langchain_openai import ChatOpenAI
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 from langchain_core.prompts import ChatPromptTemplate
-from config.settings import OPENAI_API_KEY, MODEL
+from config.settings import OPENAI_API_KEY, MODEL, AGENT_VERBOSE
 from tools import ALL_TOOLS
 
 class AutomotiveAgent:
     def __init__(self):
-        self.llm = ChatOpenAI(model=MODEL, api_key = OPENAI_API_KEY)
-        self.tools = ALL_TOOLS,
+        self.llm = ChatOpenAI(model=MODEL, api_key = OPENAI_API_KEY, streaming=True)
+        self.tools = ALL_TOOLS
         self.agent = self._create_agent()
 
     def _create_agent(self):
@@ -20,19 +20,39 @@ class AutomotiveAgent:
         )
 
         agent = create_tool_calling_agent(self.llm, self.tools, prompt)
-        return AgentExecutor(agent=agent, tools=self.tools, verbose=True)
+        return AgentExecutor(agent=agent, tools=self.tools, verbose=AGENT_VERBOSE)
+
     def chat(self, message: str, chat_history=None):
         return self.agent.invoke({
             "input": message,
             "chat_history": chat_history or []
         })
-automotive_agent = AutomotiveAgent()
-
-
-
-
-
-
 
+    async def achat(self, message: str, chat_history=None):
+        # The async executor runs the tool calls of one step concurrently
+        return await self.agent.ainvoke({
+            "input": message,
+            "chat_history": chat_history or []
+        })
 
+    async def astream(self, message: str, chat_history=None):
+        """Yield {"type": "token" | "tool_start" | "tool_end" | "final", ...} events as they happen"""
+        events = self.agent.astream_events({
+            "input": message,
+            "chat_history": chat_history or []
+        }, version="v2")
+
+        async for event in events:
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                content = event["data"]["chunk"].content
+                if content:
+                    yield {"type": "token", "content": content}
+            elif kind == "on_tool_start":
+                yield {"type": "tool_start", "name": event["name"], "input": event["data"].get("input")}
+            elif kind == "on_tool_end":
+                yield {"type": "tool_end", "name": event["name"], "output": str(event["data"].get("output"))}
+            elif kind == "on_chain_end" and not event["parent_ids"]:
+                yield {"type": "final", "output": event["data"]["output"]["output"]}
 
+automotive_agent = AutomotiveAgent()
@@ -7,3 +7,21 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 MODEL = "gpt-4.1-mini"
 
+# Session memory: prompt tokens of history kept per session, and the
+# total kept across all sessions before idle sessions are evicted
+SESSION_TOKEN_BUDGET = int(os.getenv("SESSION_TOKEN_BUDGET", 2000))
+SESSION_MEMORY_BUDGET = int(os.getenv("SESSION_MEMORY_BUDGET", 2_000_000))
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", 10000))
+
+# Where conversations are persisted: memory, sqlite (SESSION_DB) or redis (SESSION_REDIS_URL)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_DB = os.getenv("SESSION_DB", "sessions.db")
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+
+# Vehicle catalogue CSV/Parquet (make, model, year, price[, trim]); the built-in sample without one
+VEHICLE_CATALOGUE = os.getenv("VEHICLE_CATALOGUE")
+CATALOGUE_RELOAD_SECONDS = float(os.getenv("CATALOGUE_RELOAD_SECONDS", 5))
+
+# "production" turns off the agent's verbose chain logging
+ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+AGENT_VERBOSE = os.getenv("AGENT_VERBOSE", "0" if ENVIRONMENT == "production" else "1") == "1"
@@ -1,16 +1,18 @@
+import asyncio
+
 from agents import automotive_agent
 from memory import session_manager
 
-def main():
+async def main():
     print("Automotive Agent")
     print("Try: 'What's the price of a 2024 Toyota Camry?'")
-    print("Then: 'Calculate payment with $3000 down and 4.5% interest'")
+    print("Then: 'Show payments for 36, 48 and 60 months with $0, $3000 and $5000 down at 4.5%'")
     print("Type 'quit' to exit\n")
 
     session_id = "demo_session"
 
     while True:
-        user_input = input("You: ").strip()
+        user_input = (await asyncio.to_thread(input, "You: ")).strip()
 
         if user_input.lower() in ['quit', 'exit', 'bye']:
             break
@@ -19,10 +21,16 @@ def main():
         try:
             history = session_manager.get_history(session_id)
 
-            response = automotive_agent.chat(user_input, history)
-            ai_message = response["output"]
-
-            print(f"Agent: {ai_message}\n")
+            ai_message = ""
+            print("Agent: ", end="", flush=True)
+            async for event in automotive_agent.astream(user_input, history):
+                if event["type"] == "token":
+                    print(event["content"], end="", flush=True)
+                elif event["type"] == "tool_start":
+                    print(f"\n  [{event['name']}...]", flush=True)
+                elif event["type"] == "final":
+                    ai_message = event["output"]
+            print("\n")
 
             session_manager.add_messages(session_id, user_input, ai_message)
 
@@ -30,4 +38,4 @@ def main():
             print(f"Error: {e}\n")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+# memory/backends.py
+import json
+import os
+import sqlite3
+import threading
+
+
+class MemoryBackend:
+    """Turns kept in this process only; lost on restart"""
+
+    def __init__(self):
+        self.turns = {}      # session_id -> [(role, text, tokens)] still in the prompt
+        self.offsets = {}    # session_id -> turns summarized and dropped from the front
+        self.summaries = {}  # session_id -> (summary, keep_from)
+
+    def append(self, session_id: str, turns: list) -> int:
+        log = self.turns.setdefault(session_id, [])
+        log.extend(turns)
+        return self.length(session_id)
+
+    def length(self, session_id: str) -> int:
+        return self.offsets.get(session_id, 0) + len(self.turns.get(session_id, ()))
+
+    def set_summary(self, session_id: str, summary: str, keep_from: int):
+        offset = self.offsets.get(session_id, 0)
+        if keep_from < offset:
+            return  # an older trim than the one already applied
+        self.summaries[session_id] = (summary, keep_from)
+        # Nothing reads turns before keep_from again, so they needn't stay in memory
+        del self.turns.setdefault(session_id, [])[:keep_from - offset]
+        self.offsets[session_id] = keep_from
+
+    def load(self, session_id: str):
+        """(summary, keep_from, turns from keep_from on, total turns written)"""
+        summary, keep_from = self.summaries.get(session_id, ("", 0))
+        log = self.turns.get(session_id, [])
+        return summary, keep_from, log[keep_from - self.offsets.get(session_id, 0):], self.length(session_id)
+
+    def delete(self, session_id: str):
+        self.turns.pop(session_id, None)
+        self.offsets.pop(session_id, None)
+        self.summaries.pop(session_id, None)
+
+
+class SQLiteBackend:
+    """Append-only turn log in a WAL-mode SQLite file shared by worker processes"""
+
+    def __init__(self, path="sessions.db"):
+        self.path = path
+        self.local = threading.local()
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS turns (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                tokens INTEGER NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                session_id TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                keep_from INTEGER NOT NULL
+            )
+        """)
+
+    def _connect(self):
+        """One connection per thread (and per process after a fork)"""
+        conn = getattr(self.local, "conn", None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn, self.local.pid = conn, os.getpid()
+        return conn
+
+    def append(self, session_id: str, turns: list) -> int:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            seq = self._length(conn, session_id)
+            conn.executemany(
+                "INSERT INTO turns (session_id, seq, role, text, tokens) VALUES (?, ?, ?, ?, ?)",
+                [(session_id, seq + i, role, text, tokens) for i, (role, text, tokens) in enumerate(turns)]
+            )
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return seq + len(turns)
+
+    def _length(self, conn, session_id):
+        row = conn.execute("SELECT MAX(seq) FROM turns WHERE session_id = ?", (session_id,)).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def length(self, session_id: str) -> int:
+        return self._length(self._connect(), session_id)
+
+    def set_summary(self, session_id: str, summary: str, keep_from: int):
+        self._connect().execute(
+            "INSERT INTO summaries (session_id, summary, keep_from) VALUES (?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET summary = excluded.summary, keep_from = excluded.keep_from "
+            "WHERE excluded.keep_from > summaries.keep_from",
+            (session_id, summary, keep_from)
+        )
+
+    def load(self, session_id: str):
+        conn = self._connect()
+        row = conn.execute("SELECT summary, keep_from FROM summaries WHERE session_id = ?", (session_id,)).fetchone()
+        summary, keep_from = row or ("", 0)
+        rows = conn.execute(
+            "SELECT role, text, tokens FROM turns WHERE session_id = ? AND seq >= ? ORDER BY seq",
+            (session_id, keep_from)
+        ).fetchall()
+        return summary, keep_from, rows, keep_from + len(rows)
+
+    def delete(self, session_id: str):
+        conn = self._connect()
+        conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM summaries WHERE session_id = ?", (session_id,))
+
+
+# Move keep_from forward only, so a slower concurrent trim can't restore summarized turns
+_SET_SUMMARY_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'keep_from') or '-1')
+if tonumber(ARGV[2]) <= current then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'summary', ARGV[1], 'keep_from', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RedisBackend:
+    """Turns in a Redis list per session; works with any Redis-protocol server"""
+
+    def __init__(self, url="redis://localhost:6379/0", prefix="automotive:session:", ttl=7 * 86400):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("SESSION_BACKEND=redis needs the redis package: pip install redis")
+        self.redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl = ttl  # idle sessions expire server-side
+        self._set_summary = self.redis.register_script(_SET_SUMMARY_SCRIPT)
+
+    def _keys(self, session_id):
+        return f"{self.prefix}{session_id}:turns", f"{self.prefix}{session_id}:summary"
+
+    def append(self, session_id: str, turns: list) -> int:
+        turns_key, summary_key = self._keys(session_id)
+        pipe = self.redis.pipeline()
+        pipe.rpush(turns_key, *(json.dumps(turn) for turn in turns))
+        pipe.expire(turns_key, self.ttl)
+        pipe.expire(summary_key, self.ttl)
+        return pipe.execute()[0]
+
+    def length(self, session_id: str) -> int:
+        return self.redis.llen(self._keys(session_id)[0])
+
+    def set_summary(self, session_id: str, summary: str, keep_from: int):
+        self._set_summary(keys=[self._keys(session_id)[1]], args=[summary, keep_from, self.ttl])
+
+    def load(self, session_id: str):
+        turns_key, summary_key = self._keys(session_id)
+        stored = self.redis.hgetall(summary_key)
+        summary = stored.get(b"summary", b"").decode()
+        keep_from = int(stored.get(b"keep_from", 0))
+        turns = [tuple(json.loads(turn)) for turn in self.redis.lrange(turns_key, keep_from, -1)]
+        return summary, keep_from, turns, keep_from + len(turns)
+
+    def delete(self, session_id: str):
+        self.redis.delete(*self._keys(session_id))
+
+
+def create_backend(name: str, **options):
+    """Backend by SESSION_BACKEND name: memory, sqlite or redis"""
+    if name == "memory":
+        return MemoryBackend()
+    if name == "sqlite":
+        return SQLiteBackend(options.get("path", "sessions.db"))
+    if name == "redis":
+        return RedisBackend(options.get("url", "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown session backend: {name}")
@@ -1,23 +1,187 @@
 # memory/session_manager.py
-from langchain_core.messages import HumanMessage, AIMessage
+import sys
+import threading
+from collections import OrderedDict
+
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from config.settings import (MODEL, SESSION_TOKEN_BUDGET, SESSION_MEMORY_BUDGET, MAX_SESSIONS,
+                             SESSION_BACKEND, SESSION_DB, SESSION_REDIS_URL)
+from .backends import create_backend
+
+try:
+    import tiktoken
+    try:
+        _encoding = tiktoken.encoding_for_model(MODEL)
+    except KeyError:
+        _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:  # not installed, or its encoding can't be downloaded
+    _encoding = None
+
+# Turns are stored as (role, text) tuples instead of message objects
+HUMAN, AI, SUMMARY = 0, 1, 2
+MESSAGE_TYPES = {HUMAN: HumanMessage, AI: AIMessage, SUMMARY: SystemMessage}
+
+SUMMARY_TOKENS = 200  # cap on the digest of trimmed turns
+SUMMARY_SNIPPET = 80  # characters kept from each trimmed customer message
+
+
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1  # ~4 characters per token
+
+
+def summarize_turns(summary: str, turns: list) -> str:
+    """Fold trimmed turns into the running digest: what the customer asked, oldest first"""
+    asked = [text[:SUMMARY_SNIPPET] for role, text, _ in turns if role == HUMAN]
+    digest = "; ".join(filter(None, [summary.removeprefix("Earlier in this conversation the customer asked: ")] + asked))
+    # Keep the most recent questions when the digest outgrows its cap
+    while digest and count_tokens(digest) > SUMMARY_TOKENS:
+        digest = digest.partition("; ")[2]
+    return f"Earlier in this conversation the customer asked: {digest}" if digest else ""
+
+
+class Session:
+    __slots__ = ("turns", "tokens", "summary", "summary_tokens", "trimmed_tokens", "seq")
+
+    def __init__(self, turns=(), summary="", seq=0):
+        self.turns = [(role, sys.intern(text), tokens) for role, text, tokens in turns]  # oldest first
+        self.tokens = sum(tokens for _, _, tokens in self.turns)
+        self.summary = summary
+        self.summary_tokens = count_tokens(summary) if summary else 0
+        self.trimmed_tokens = 0  # history tokens no longer sent with each prompt
+        self.seq = seq  # turns written to the backend that this copy reflects
+
+    def size(self) -> int:
+        return sum(sys.getsizeof(text) for _, text, _ in self.turns) + sys.getsizeof(self.summary)
 
 
 class SimpleSessionManager:
-    def __init__(self):
-        self.sessions = {}  # session_id -> list of messages
+    """Per-session history trimmed to a token budget.
+
+    Turns are appended to the backend and cached here read-through; idle
+    sessions leave the cache LRU and are lazily reloaded when touched again.
+    """
+
+    def __init__(self, backend=None, token_budget=SESSION_TOKEN_BUDGET, memory_budget=SESSION_MEMORY_BUDGET,
+                 max_sessions=MAX_SESSIONS, summarizer=summarize_turns):
+        self.backend = backend or create_backend("memory")
+        self.token_budget = token_budget
+        self.memory_budget = memory_budget  # total tokens held across sessions
+        self.max_sessions = max_sessions
+        self.summarizer = summarizer  # None drops trimmed turns outright
+        self.sessions = OrderedDict()  # session_id -> Session, least recently used first
+        self.total_tokens = 0
+        self.lock = threading.Lock()
+        self.counters = {"turns_trimmed": 0, "tokens_trimmed": 0, "prompt_tokens_saved": 0,
+                         "sessions_evicted": 0, "sessions_loaded": 0}
+
+    def _touch(self, session_id: str) -> Session:
+        """Cached session, (re)loaded when missing or another process has written to it"""
+        session = self.sessions.get(session_id)
+        if session is None or self.backend.length(session_id) != session.seq:
+            session = self._load(session_id)
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def _load(self, session_id: str) -> Session:
+        summary, _, turns, seq = self.backend.load(session_id)
+        session = Session(turns, summary, seq)
+        stale = self._forget(session_id)
+        if stale:
+            session.trimmed_tokens = stale.trimmed_tokens
+        self.sessions[session_id] = session
+        self.total_tokens += session.tokens + session.summary_tokens
+        self.counters["sessions_loaded"] += 1
+        self._trim(session_id, session)
+        return session
+
+    def _forget(self, session_id: str):
+        session = self.sessions.pop(session_id, None)
+        if session:
+            self.total_tokens -= session.tokens + session.summary_tokens
+        return session
 
     def add_messages(self, session_id: str, user_msg: str, ai_msg: str):
-        if session_id not in self.sessions:
-            self.sessions[session_id] = []
+        turns = [(role, text, count_tokens(text)) for role, text in ((HUMAN, user_msg), (AI, ai_msg))]
+        with self.lock:
+            session = self._touch(session_id)
+            seq = self.backend.append(session_id, turns)
+            if seq != session.seq + len(turns):
+                session = self._load(session_id)  # another process appended in between
+            else:
+                for role, text, tokens in turns:
+                    session.turns.append((role, sys.intern(text), tokens))
+                    session.tokens += tokens
+                    self.total_tokens += tokens
+                session.seq = seq
+                self._trim(session_id, session)
+            self._evict(keep=session_id)
+
+    def _trim(self, session_id: str, session: Session):
+        """Drop the oldest exchanges until the session fits its budget"""
+        if session.tokens + session.summary_tokens <= self.token_budget:
+            return
+        cut, freed = 0, 0
+        # Trim whole exchanges, and always keep the latest one
+        while cut < len(session.turns) - 2 and session.tokens - freed + session.summary_tokens > self.token_budget:
+            freed += session.turns[cut][2] + session.turns[cut + 1][2]
+            cut += 2
+        if not cut:
+            return
+
+        trimmed, session.turns = session.turns[:cut], session.turns[cut:]
+        session.tokens -= freed
+        self.total_tokens -= freed
+        if self.summarizer:
+            self.total_tokens -= session.summary_tokens
+            session.summary = self.summarizer(session.summary, trimmed)
+            session.summary_tokens = count_tokens(session.summary) if session.summary else 0
+            self.total_tokens += session.summary_tokens
+        session.trimmed_tokens += freed
+        # The log itself is never rewritten; the next load starts after the trimmed turns
+        self.backend.set_summary(session_id, session.summary, session.seq - len(session.turns))
+        self.counters["turns_trimmed"] += cut
+        self.counters["tokens_trimmed"] += freed
 
-        self.sessions[session_id].extend([
-            HumanMessage(content=user_msg),
-            AIMessage(content=ai_msg)
-        ])
+    def _evict(self, keep: str):
+        while len(self.sessions) > 1 and (self.total_tokens > self.memory_budget
+                                          or len(self.sessions) > self.max_sessions):
+            session_id, session = next(iter(self.sessions.items()))
+            if session_id == keep:
+                break
+            del self.sessions[session_id]
+            self.total_tokens -= session.tokens + session.summary_tokens
+            self.counters["sessions_evicted"] += 1
 
     def get_history(self, session_id: str):
-        return self.sessions.get(session_id, [])
+        with self.lock:
+            session = self._touch(session_id)
+            if not session.seq:
+                del self.sessions[session_id]  # nothing stored, don't cache an empty session
+                return []
+            self.counters["prompt_tokens_saved"] += session.trimmed_tokens
+            turns = [(SUMMARY, session.summary)] if session.summary else []
+            turns += [(role, text) for role, text, _ in session.turns]
+        return [MESSAGE_TYPES[role](content=text) for role, text in turns]
+
+    def clear(self, session_id: str):
+        with self.lock:
+            self._forget(session_id)
+            self.backend.delete(session_id)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                **self.counters,
+                "sessions": len(self.sessions),
+                "resident_tokens": self.total_tokens,
+                "resident_bytes": sum(session.size() for session in self.sessions.values()),
+                "token_budget": self.token_budget,
+                "memory_budget": self.memory_budget,
+                "backend": type(self.backend).__name__
+            }
 
 
 # Global instance
-session_manager = SimpleSessionManager()
+session_manager = SimpleSessionManager(create_backend(SESSION_BACKEND, path=SESSION_DB, url=SESSION_REDIS_URL))
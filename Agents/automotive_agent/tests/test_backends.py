@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("dotenv")
+
+from memory.backends import MemoryBackend, SQLiteBackend
+from memory.session_manager import SimpleSessionManager
+
+
+def chat(manager, session_id, exchanges):
+    for i in range(exchanges):
+        manager.add_messages(session_id, f"question {i} " + "word " * 40, f"answer {i} " + "word " * 40)
+
+
+def test_memory_backend_drops_summarized_turns():
+    backend = MemoryBackend()
+    manager = SimpleSessionManager(backend=backend, token_budget=200)
+    chat(manager, "s1", 50)
+
+    summary, keep_from, turns, seq = backend.load("s1")
+    assert seq == backend.length("s1") == 100
+    assert keep_from > 0 and summary
+    # Only the turns still sent with the prompt are held
+    assert len(backend.turns["s1"]) == len(turns) == 100 - keep_from
+    assert backend.offsets["s1"] == keep_from
+    assert turns[-1][1].startswith("answer 49")
+
+
+def test_trimmed_memory_backend_reloads_like_sqlite(tmp_path):
+    memory, sqlite = MemoryBackend(), SQLiteBackend(str(tmp_path / "sessions.db"))
+    for backend in (memory, sqlite):
+        chat(SimpleSessionManager(backend=backend, token_budget=200), "s1", 20)
+
+    summary, keep_from, turns, seq = sqlite.load("s1")
+    assert memory.load("s1") == (summary, keep_from, [tuple(turn) for turn in turns], seq)
+    # A fresh cache over the trimmed backend sees the same history
+    reloaded = SimpleSessionManager(backend=memory, token_budget=200).get_history("s1")
+    assert [m.content for m in reloaded[1:]] == [text for _, text, _ in memory.load("s1")[2]]
+
+
+def test_stale_summary_does_not_restore_trimmed_turns():
+    backend = MemoryBackend()
+    backend.append("s1", [(0, f"turn {i}", 1) for i in range(10)])
+    backend.set_summary("s1", "newer", 6)
+    backend.set_summary("s1", "older", 4)
+
+    assert backend.load("s1") == ("newer", 6, [(0, f"turn {i}", 1) for i in range(6, 10)], 10)
+    assert backend.append("s1", [(1, "turn 10", 1)]) == 11
+
+
+def test_redis_summary_only_moves_forward(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis runs Lua scripts through lupa
+    import redis
+    monkeypatch.setattr(redis.Redis, "from_url", staticmethod(lambda url: fakeredis.FakeRedis()))
+    from memory.backends import RedisBackend
+
+    backend = RedisBackend()
+    backend.append("s1", [(0, f"turn {i}", 1) for i in range(10)])
+    backend.set_summary("s1", "newer", 6)
+    backend.set_summary("s1", "older", 4)
+
+    summary, keep_from, turns, seq = backend.load("s1")
+    assert (summary, keep_from, seq) == ("newer", 6, 10)
+    assert [text for _, text, _ in turns] == [f"turn {i}" for i in range(6, 10)]
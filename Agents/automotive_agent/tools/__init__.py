@@ -1,2 +1 @@
-from .vehicle_tools import get_vehicle_price, calculate_payment
-ALL_TOOLS = [get_vehicle_price, calculate_payment]
+from .vehicle_tools import ALL_TOOLS, get_vehicle_price, search_vehicles, calculate_payment, calculate_payment_grid
@@ -0,0 +1,206 @@
+# tools/catalogue.py
+import os
+import re
+import threading
+import time
+from difflib import get_close_matches
+
+import numpy as np
+import pandas as pd
+
+# Misspellings and nicknames the fuzzy matcher can't be expected to guess
+MAKE_ALIASES = {"chevy": "chevrolet", "vw": "volkswagen", "merc": "mercedesbenz", "mercedes": "mercedesbenz"}
+
+YEAR_BITS, MODEL_BITS = 12, 20  # (make, model, year) packed into one int64 key
+
+
+def normalize(name) -> str:
+    """Lower-case alphanumerics only, so 'F-150', 'f150' and 'F 150' match"""
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+def _pack(make, model, year):
+    return (np.int64(make) << (MODEL_BITS + YEAR_BITS)) | (np.int64(model) << YEAR_BITS) | np.int64(year)
+
+
+class CatalogueSnapshot:
+    """Immutable columnar catalogue: one numpy array per column plus small vocabularies"""
+
+    def __init__(self, frame: pd.DataFrame):
+        frame = frame.rename(columns=str.lower)
+        if "trim" not in frame:
+            frame["trim"] = ""
+        frame = frame.dropna(subset=["make", "model", "year", "price"])
+
+        make_norm = frame["make"].map(normalize)
+        model_norm = make_norm + "|" + frame["model"].map(normalize)
+        make_codes, make_keys = pd.factorize(make_norm)
+        model_codes, model_keys = pd.factorize(model_norm)
+        trim_codes, self.trims = pd.factorize(frame["trim"].fillna("").astype(str))
+
+        # Display names as first spelled in the file
+        self.makes = frame["make"].groupby(make_codes).first().tolist()
+        self.models = frame["model"].groupby(model_codes).first().tolist()
+        self.make_index = {key: code for code, key in enumerate(make_keys)}
+        self.model_index = {}  # make code -> {normalized model: model code}
+        for code, key in enumerate(model_keys):
+            make_key, model_key = key.split("|", 1)
+            self.model_index.setdefault(self.make_index[make_key], {})[model_key] = code
+
+        self.make = make_codes.astype(np.int32)
+        self.model = model_codes.astype(np.int32)
+        self.year = frame["year"].to_numpy(dtype=np.int16)
+        self.price = frame["price"].to_numpy(dtype=np.float64)
+        self.trim = trim_codes.astype(np.int32)
+
+        # Exact lookups binary-search the packed keys; price bands slice the price order
+        keys = _pack(self.make, self.model, self.year)
+        self.by_key = np.argsort(keys, kind="stable")
+        self.keys = keys[self.by_key]
+        self.by_price = np.argsort(self.price, kind="stable")
+        self.prices = self.price[self.by_price]
+
+    def __len__(self):
+        return len(self.price)
+
+    def resolve(self, make: str, model: str):
+        """(make code, model code, corrected) for a possibly misspelled make and model"""
+        corrected = False
+        key = normalize(make)
+        key = MAKE_ALIASES.get(key, key)
+        if key not in self.make_index:
+            close = get_close_matches(key, self.make_index, n=1, cutoff=0.75)
+            if not close:
+                return None
+            key, corrected = close[0], True
+        make_code = self.make_index[key]
+
+        models = self.model_index[make_code]
+        key = normalize(model)
+        if key not in models:
+            close = get_close_matches(key, models, n=1, cutoff=0.7)
+            if not close:
+                return None
+            key, corrected = close[0], True
+        return make_code, models[key], corrected
+
+    def rows(self, make_code, model_code, year_from, year_to):
+        """Row indices for one model across a year range"""
+        lo = np.searchsorted(self.keys, _pack(make_code, model_code, year_from), side="left")
+        hi = np.searchsorted(self.keys, _pack(make_code, model_code, year_to), side="right")
+        return self.by_key[lo:hi]
+
+    def record(self, row) -> dict:
+        return {
+            "make": self.makes[self.make[row]],
+            "model": self.models[self.model[row]],
+            "year": int(self.year[row]),
+            "trim": self.trims[self.trim[row]],
+            "price": float(self.price[row])
+        }
+
+
+class VehicleCatalogue:
+    """Vehicle prices from a CSV or Parquet file, reloaded when the file changes"""
+
+    def __init__(self, path=None, reload_seconds=5, fallback=None):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self.fallback = fallback or {}  # (make, model, year) -> price, used without a file
+        self.mtime = None
+        self.checked_at = 0.0
+        self.reload_lock = threading.Lock()
+        self.snapshot = self._load()
+
+    def _read(self) -> pd.DataFrame:
+        if not self.path:
+            return pd.DataFrame(
+                [(make, model, year, price) for (make, model, year), price in self.fallback.items()],
+                columns=["make", "model", "year", "price"]
+            )
+        if self.path.endswith(".parquet"):
+            return pd.read_parquet(self.path)  # needs pyarrow or fastparquet
+        return pd.read_csv(self.path)
+
+    def _load(self) -> CatalogueSnapshot:
+        if self.path:
+            self.mtime = os.stat(self.path).st_mtime
+        return CatalogueSnapshot(self._read())
+
+    def maybe_reload(self):
+        """Swap in a fresh snapshot if the file changed; lookups keep using the old one meanwhile"""
+        now = time.monotonic()
+        if not self.path or now - self.checked_at < self.reload_seconds:
+            return
+        if not self.reload_lock.acquire(blocking=False):
+            return
+        try:
+            self.checked_at = now
+            if os.stat(self.path).st_mtime != self.mtime:
+                self.snapshot = self._load()
+                print(f"Reloaded vehicle catalogue: {len(self.snapshot):,} trims")
+        except Exception as e:
+            print(f"Catalogue reload error: {e}")
+        finally:
+            self.reload_lock.release()
+
+    def lookup(self, make: str, model: str, year: int):
+        """Every trim of one model year, cheapest first.
+
+        Returns {"make", "model", "year", "corrected", "trims", "years"}: trims is
+        empty and years lists what is available when the year isn't stocked.
+        """
+        self.maybe_reload()
+        snapshot = self.snapshot
+        resolved = snapshot.resolve(make, model)
+        if resolved is None:
+            return None
+        make_code, model_code, corrected = resolved
+
+        rows = snapshot.rows(make_code, model_code, int(year), int(year))
+        rows = rows[np.argsort(snapshot.price[rows], kind="stable")]
+        years = []
+        if not len(rows):
+            years = sorted(set(snapshot.year[snapshot.rows(make_code, model_code, 0, (1 << YEAR_BITS) - 1)].tolist()))
+        return {
+            "make": snapshot.makes[make_code],
+            "model": snapshot.models[model_code],
+            "year": int(year),
+            "corrected": corrected,
+            "trims": [snapshot.record(row) for row in rows],
+            "years": years
+        }
+
+    def search(self, min_price=None, max_price=None, min_year=None, max_year=None, make=None, limit=10):
+        """Trims inside a price band and year range, cheapest first"""
+        self.maybe_reload()
+        snapshot = self.snapshot
+        lo = 0 if min_price is None else np.searchsorted(snapshot.prices, min_price, side="left")
+        hi = len(snapshot) if max_price is None else np.searchsorted(snapshot.prices, max_price, side="right")
+        rows = snapshot.by_price[lo:hi]
+
+        mask = np.ones(len(rows), dtype=bool)
+        if min_year is not None:
+            mask &= snapshot.year[rows] >= min_year
+        if max_year is not None:
+            mask &= snapshot.year[rows] <= max_year
+        if make:
+            key = normalize(make)
+            key = MAKE_ALIASES.get(key, key)
+            close = get_close_matches(key, snapshot.make_index, n=1, cutoff=0.75)
+            if not close:
+                return []
+            mask &= snapshot.make[rows] == snapshot.make_index[close[0]]
+        return [snapshot.record(row) for row in rows[mask][:limit]]
+
+    def stats(self) -> dict:
+        snapshot = self.snapshot
+        columns = (snapshot.make, snapshot.model, snapshot.year, snapshot.price, snapshot.trim,
+                   snapshot.keys, snapshot.by_key, snapshot.prices, snapshot.by_price)
+        return {
+            "trims": len(snapshot),
+            "makes": len(snapshot.makes),
+            "models": len(snapshot.models),
+            "column_bytes": sum(column.nbytes for column in columns),
+            "path": self.path
+        }
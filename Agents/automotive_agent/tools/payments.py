@@ -0,0 +1,58 @@
+# tools/payments.py
+import numpy as np
+
+MAX_CELLS = 500  # keeps a grid readable in one tool reply
+MAX_SCHEDULE_MONTHS = 120  # longest loan a schedule is produced for
+
+
+def payment_grid(price: float, terms, rates, down_payments):
+    """Monthly payments for every down payment x APR x term, shape (downs, rates, terms)"""
+    terms = np.asarray(terms, dtype=np.float64)[None, None, :]
+    monthly = np.asarray(rates, dtype=np.float64)[None, :, None] / 100 / 12
+    principal = np.maximum(price - np.asarray(down_payments, dtype=np.float64), 0)[:, None, None]
+
+    growth = (1 + monthly) ** terms
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payments = np.where(monthly > 0, principal * monthly * growth / (growth - 1), principal / terms)
+    return payments, np.broadcast_to(principal, payments.shape)
+
+
+def amortization_schedule(principal: float, rate: float, months: int):
+    """(month, interest, principal paid, remaining balance) arrays for one loan"""
+    monthly = rate / 100 / 12
+    payment = payment_grid(principal, [months], [rate], [0])[0].item()
+    k = np.arange(1, months + 1)
+    if monthly > 0:
+        balance = principal * (1 + monthly) ** k - payment * ((1 + monthly) ** k - 1) / monthly
+    else:
+        balance = principal - payment * k
+    balance = np.maximum(balance, 0)
+    previous = np.concatenate(([principal], balance[:-1]))
+    interest = previous * monthly
+    return k, interest, payment - interest, balance
+
+
+def format_grid(price, terms, rates, down_payments, payments, principal) -> str:
+    """One row per down payment and APR, one column per term: payment (total interest)"""
+    total_interest = payments * np.asarray(terms)[None, None, :] - principal
+    lines = [f"Price ${price:,.0f} - monthly payment (total interest)",
+             "down / APR | " + " | ".join(f"{term} mo" for term in terms)]
+    for d, down in enumerate(down_payments):
+        for r, rate in enumerate(rates):
+            cells = " | ".join(f"${payments[d, r, t]:,.0f} (${total_interest[d, r, t]:,.0f})" for t in range(len(terms)))
+            lines.append(f"${down:,.0f} / {rate:g}% | {cells}")
+    return "\n".join(lines)
+
+
+def format_schedule(principal, rate, months, down_payment=0) -> str:
+    """Amortisation summarised per year to stay compact"""
+    k, interest, paid, balance = amortization_schedule(principal, rate, months)
+    years = (k - 1) // 12
+    interest_by_year = np.bincount(years, weights=interest)
+    paid_by_year = np.bincount(years, weights=paid)
+    year_end_balance = balance[np.minimum(np.arange(1, len(interest_by_year) + 1) * 12, months) - 1]
+    financed = f"${principal:,.0f}" + (f" (${down_payment:,.0f} down)" if down_payment else "")
+    lines = [f"Schedule for {financed} at {rate:g}% over {months} months (per year: interest / principal / balance)"]
+    lines += [f"Year {y + 1}: ${interest_by_year[y]:,.0f} / ${paid_by_year[y]:,.0f} / ${year_end_balance[y]:,.0f}"
+              for y in range(len(interest_by_year))]
+    return "\n".join(lines)
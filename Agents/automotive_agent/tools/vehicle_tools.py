@@ -1,47 +1,107 @@
-from langchain_core.tools import Tool
+from typing import Optional
 
-# Simple mock data
+from langchain_core.tools import StructuredTool
+from config.settings import VEHICLE_CATALOGUE, CATALOGUE_RELOAD_SECONDS
+from .catalogue import VehicleCatalogue
+from .payments import MAX_CELLS, MAX_SCHEDULE_MONTHS, payment_grid, format_grid, format_schedule
+
+# Sample data used when no VEHICLE_CATALOGUE file is configured
 VEHICLES = {
-    ("toyota", "camry", 2024): 28000,
-    ("honda", "civic", 2024): 25000,
-    ("ford", "f150", 2024): 35000,
+    ("Toyota", "Camry", 2024): 28000,
+    ("Honda", "Civic", 2024): 25000,
+    ("Ford", "F150", 2024): 35000,
 }
 
+catalogue = VehicleCatalogue(VEHICLE_CATALOGUE, CATALOGUE_RELOAD_SECONDS, fallback=VEHICLES)
+
 # Tool functions without Pydantic
 def get_vehicle_price(make: str, model: str, year: int) -> str:
-    key = (make.lower(), model.lower(), year)
-    price = VEHICLES.get(key)
-    if price is None:
+    found = catalogue.lookup(make, model, year)
+    if found is None:
         return f"Price not found for {year} {make} {model}"
-    return f"The {year} {make} {model} costs ${price:,}"
-
-def calculate_payment(price: str, down_payment: int, interest_rate: float) -> str:
-    import re
-    price_match = re.search(r'\$(\d+(?:,\d+)*)', price)
-    if not price_match:
-        return "Could not parse price"
-    price_value = int(price_match.group(1).replace(',', ''))
-    loan_amount = price_value - down_payment
-    monthly_rate = interest_rate / 100 / 12
-    months = 60
-    if monthly_rate == 0:
-        payment = loan_amount / months
-    else:
-        payment = loan_amount * (monthly_rate * (1 + monthly_rate) ** months) / ((1 + monthly_rate) ** months - 1)
-    return f"Monthly payment: ${payment:.2f} for 60 months"
+    name = f"{year} {found['make']} {found['model']}"
+    if not found["trims"]:
+        available = ", ".join(map(str, found["years"][-5:]))
+        return f"Price not found for {name}. Available years: {available}"
+
+    trims = found["trims"]
+    base = trims[0]["price"]
+    answer = f"The {name} costs ${base:,.0f}"
+    if len(trims) > 1:
+        answer += f" ({trims[0]['trim'] or 'base'}) up to ${trims[-1]['price']:,.0f} ({trims[-1]['trim']}) across {len(trims)} trims"
+    if found["corrected"]:
+        answer += f" (closest match to '{make} {model}')"
+    return answer
+
+def search_vehicles(min_price: float = None, max_price: float = None, min_year: int = None,
+                    max_year: int = None, make: str = None, limit: int = 10) -> str:
+    matches = catalogue.search(min_price, max_price, min_year, max_year, make, min(limit, 25))
+    if not matches:
+        return "No vehicles match those criteria"
+    return "\n".join(
+        f"{m['year']} {m['make']} {m['model']}{' ' + m['trim'] if m['trim'] else ''}: ${m['price']:,.0f}"
+        for m in matches
+    )
+
+def calculate_payment(price: float, down_payment: float, interest_rate: float) -> str:
+    if price <= 0:
+        return "Need a positive price"
+    if interest_rate < 0:
+        return "Interest rates can't be negative"
+    payments, _ = payment_grid(price, [60], [interest_rate], [down_payment])
+    return f"Monthly payment: ${payments.item():.2f} for 60 months"
+
+def calculate_payment_grid(price: float, terms: tuple[int, ...] = (36, 48, 60, 72),
+                           interest_rates: tuple[float, ...] = (4.5,), down_payments: tuple[float, ...] = (0,),
+                           schedule_term: Optional[int] = None) -> str:
+    if price <= 0 or not terms or not interest_rates or not down_payments:
+        return "Need a positive price and at least one term, interest rate and down payment"
+    if any(term <= 0 for term in terms):
+        return "Loan terms must be a positive number of months"
+    if any(rate < 0 for rate in interest_rates):
+        return "Interest rates can't be negative"
+    if schedule_term is not None and not 0 < schedule_term <= MAX_SCHEDULE_MONTHS:
+        return f"schedule_term must be between 1 and {MAX_SCHEDULE_MONTHS} months"
+    if len(terms) * len(interest_rates) * len(down_payments) > MAX_CELLS:
+        return f"Too many combinations; keep terms x rates x down payments under {MAX_CELLS}"
+    payments, principal = payment_grid(price, terms, interest_rates, down_payments)
+    answer = format_grid(price, terms, interest_rates, down_payments, payments, principal)
+    if schedule_term:
+        # One schedule only: the first down payment at the first rate
+        down = down_payments[0]
+        answer += "\n" + format_schedule(max(price - down, 0), interest_rates[0], schedule_term, down)
+    return answer
 
 # Wrap functions as LangChain Tools
-get_vehicle_price_tool = Tool(
-    name="get_vehicle_price",
+get_vehicle_price_tool = StructuredTool.from_function(
     func=get_vehicle_price,
+    name="get_vehicle_price",
     description="Get the price of a vehicle given make, model, and year"
 )
 
-calculate_payment_tool = Tool(
-    name="calculate_payment",
+search_vehicles_tool = StructuredTool.from_function(
+    func=search_vehicles,
+    name="search_vehicles",
+    description="Find vehicles within a price band and/or model-year range, optionally for one make, cheapest first"
+)
+
+calculate_payment_tool = StructuredTool.from_function(
     func=calculate_payment,
-    description="Calculate monthly car payment given price, down payment, and interest rate"
+    name="calculate_payment",
+    description="Monthly payment over 60 months given the numeric price, down payment (dollars) and interest rate (APR %)"
+)
+
+calculate_payment_grid_tool = StructuredTool.from_function(
+    func=calculate_payment_grid,
+    name="calculate_payment_grid",
+    description=(
+        "Monthly payments and total interest for every combination of loan terms (months), "
+        "interest rates (APR %) and down payments (dollars) in one call. Takes the numeric price. "
+        "Set schedule_term (1-120 months) to add a yearly amortisation schedule for that term, "
+        "financed at the first interest rate after the first down payment. "
+        "Prefer this over repeated calculate_payment calls"
+    )
 )
 
 # List of tools for the agent
-ALL_TOOLS = [get_vehicle_price_tool, calculate_payment_tool]
+ALL_TOOLS = [get_vehicle_price_tool, search_vehicles_tool, calculate_payment_tool, calculate_payment_grid_tool]
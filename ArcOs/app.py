@@ -4,11 +4,14 @@ Force create a single entry in the health database
 """
 
 import os
-from notion_client import Client
 from dotenv import load_dotenv
 
+import clients
+from notion_scheduler import NotionWriteScheduler
+
 load_dotenv()
-notion = Client(auth=os.getenv("NOTION_API_KEY"))
+notion = clients.notion
+notion_writer = NotionWriteScheduler(notion, rate=float(os.getenv("NOTION_RATE_LIMIT", 3)))
 
 
 def force_health_entry():
@@ -23,7 +26,7 @@ def force_health_entry():
 
     try:
         # Try with just Title first
-        response = notion.pages.create(
+        response = notion_writer.create_page(
             parent={"database_id": health_db_id},
             properties={
                 "Title": {"title": [{"text": {"content": "Morning jog - 30 minutes"}}]}
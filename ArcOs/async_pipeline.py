@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+ArcOS Async Pipeline
+Runs the LLM -> Notion -> Make.com stages on a background event loop so the
+HTTP endpoint can answer immediately with a job id. Job snapshots are also
+written to SQLite so any web worker can answer a status poll; stage updates
+are batched by a writer thread so the event loop never waits on the disk.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+
+class AsyncCommandPipeline:
+    """Accepts commands, runs them as awaitable stages and tracks job status"""
+
+    def __init__(self, analyze, create_task, trigger_automation, max_in_flight=500, job_ttl=3600, db_path=None):
+        # Stage coroutines: analyze(command), create_task(pillar, title, data),
+        # trigger_automation(pillar, action, data)
+        self.analyze = analyze
+        self.create_task = create_task
+        self.trigger_automation = trigger_automation
+        self.max_in_flight = max_in_flight
+        self.job_ttl = job_ttl
+
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self.db_path = db_path  # None keeps jobs in this process only
+        self._local = threading.local()
+        if db_path:
+            self._connect().execute(
+                "CREATE TABLE IF NOT EXISTS pipeline_jobs (job_id TEXT PRIMARY KEY, finished REAL, job TEXT NOT NULL)"
+            )
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._in_flight = 0
+        self._dirty = {}  # job_id -> (finished, snapshot) not yet written
+        self._writing = False
+        self._writer = None
+        self._writer_cond = threading.Condition()
+
+    def _connect(self):
+        """One connection per thread (and per process after a fork)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _snapshot(self, job_id):
+        with self._lock:
+            job = self.jobs[job_id]
+            return job_id, job["_finished"], json.dumps({k: v for k, v in job.items() if not k.startswith('_')})
+
+    def _write(self, rows):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            conn.executemany("INSERT OR REPLACE INTO pipeline_jobs (job_id, finished, job) VALUES (?, ?, ?)", rows)
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"Pipeline job store error: {e}")
+
+    def _persist(self, job_id):
+        """Hand the job's latest snapshot to the writer thread"""
+        if not self.db_path:
+            return
+        job_id, finished, snapshot = self._snapshot(job_id)
+        with self._writer_cond:
+            self._dirty[job_id] = (finished, snapshot)
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name="arcos-pipeline-store", daemon=True)
+                self._writer.start()
+            self._writer_cond.notify()
+
+    def _write_loop(self):
+        """Write pending snapshots in one transaction per batch"""
+        while True:
+            with self._writer_cond:
+                while not self._dirty:
+                    self._writer_cond.wait()
+                batch, self._dirty = self._dirty, {}
+                self._writing = True
+            self._write([(job_id, finished, snapshot) for job_id, (finished, snapshot) in batch.items()])
+            with self._writer_cond:
+                self._writing = False
+                self._writer_cond.notify_all()
+
+    def _flush(self, timeout):
+        """Wait for the writer thread to store every pending snapshot"""
+        with self._writer_cond:
+            self._writer_cond.wait_for(lambda: not self._dirty and not self._writing, timeout)
+
+    def _ensure_started(self):
+        """Start the event loop thread on first use"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(self._loop)
+                self._semaphore = asyncio.Semaphore(self.max_in_flight)
+                ready.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name="arcos-async-pipeline", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def submit(self, command):
+        """Queue a command and return its job id without waiting for any stage"""
+        self._ensure_started()
+        self._prune()
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "command": command,
+                "status": "queued",
+                "stage": None,
+                "submitted_at": datetime.now().isoformat(),
+                "finished_at": None,
+                "stage_timings": {},
+                "quarterback_analysis": None,
+                "notion_result": None,
+                "automation_result": None,
+                "error": None,
+                "_finished": None
+            }
+        if self.db_path:
+            # Written before returning, so a poll to another worker finds the job
+            self._write([self._snapshot(job_id)])
+
+        asyncio.run_coroutine_threadsafe(self._run(job_id, command), self._loop)
+        return job_id
+
+    def get(self, job_id):
+        """Return a snapshot of a job, or None if it is unknown or expired"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is not None:
+                return {k: v for k, v in job.items() if not k.startswith('_')}
+        if not self.db_path:
+            return None
+        # Submitted to another worker process
+        row = self._connect().execute("SELECT job FROM pipeline_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def stats(self):
+        """Counts of jobs by status"""
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return {
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "jobs": counts
+            }
+
+    def shutdown(self, timeout=30):
+        """Wait for in-flight jobs to finish, then stop the loop"""
+        if not self._thread:
+            return
+        deadline = time.time() + timeout
+        while self._in_flight and time.time() < deadline:
+            time.sleep(0.1)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._flush(max(deadline - time.time(), 5))
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self.jobs[job_id].update(fields)
+        self._persist(job_id)
+
+    def _prune(self):
+        """Drop finished jobs older than job_ttl"""
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self.jobs.items()
+                       if job["_finished"] and job["_finished"] < cutoff]
+            for job_id in expired:
+                del self.jobs[job_id]
+        if self.db_path:
+            self._connect().execute("DELETE FROM pipeline_jobs WHERE finished < ?", (cutoff,))
+
+    async def _stage(self, job_id, name, coro):
+        """Run one stage and record how long it took"""
+        self._update(job_id, status="running", stage=name)
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            with self._lock:
+                self.jobs[job_id]["stage_timings"][name] = elapsed_ms
+
+    async def _run(self, job_id, command):
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                analysis = await self._stage(job_id, "analyze", self.analyze(command))
+                self._update(job_id, quarterback_analysis=analysis)
+
+                pillar = analysis.get('pillar', 'tasks')
+                title = analysis.get('title', command)
+                task_data = analysis.get('data', {})
+
+                notion_result = await self._stage(
+                    job_id, "notion", self.create_task(pillar, title, task_data)
+                )
+                self._update(job_id, notion_result=notion_result)
+
+                if analysis.get('automation', False):
+                    automation_result = await self._stage(
+                        job_id, "automation",
+                        self.trigger_automation(
+                            pillar,
+                            analysis.get('action'),
+                            {**task_data, 'page_id': notion_result.get('page_id')}
+                        )
+                    )
+                    self._update(job_id, automation_result=automation_result)
+
+                self._update(job_id, status="completed", stage=None)
+
+            except Exception as e:
+                print(f"Async job {job_id} error: {e}")
+                self._update(job_id, status="failed", error=str(e))
+
+            finally:
+                self._in_flight -= 1
+                self._update(job_id, finished_at=datetime.now().isoformat(), _finished=time.time())
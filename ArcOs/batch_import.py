@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+ArcOS Batch Import
+Sends a CSV or JSONL file of commands to /commands/batch in bounded batches
+and prints the per-item NDJSON results as they come back, e.g.
+
+    python batch_import.py backlog.csv
+    python batch_import.py backlog.csv --no-header
+    python batch_import.py backlog.jsonl --url http://localhost:5000 --out results.ndjson
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from clients import get_http_session
+
+
+def iter_commands(lines, fmt="jsonl", header=True):
+    """Yield command strings from an iterator of text lines.
+
+    JSONL lines may be {"command": "..."} objects or bare JSON strings. CSV
+    with a header row uses its "command" column (the first column if there
+    is none); without one, every row's first column is a command.
+    """
+    if fmt == "csv":
+        reader = csv.reader(lines)
+        column = 0
+        if header:
+            names = [h.strip().lower() for h in next(reader, [])]
+            if "command" in names:
+                column = names.index("command")
+        for row in reader:
+            if len(row) > column and row[column].strip():
+                yield row[column].strip()
+        return
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            yield line
+            continue
+        if isinstance(item, dict):
+            if item.get("command"):
+                yield item["command"]
+        elif isinstance(item, str) and item.strip():
+            yield item.strip()
+
+
+def detect_format(path):
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _post_batch(url, commands):
+    """POST one batch as JSONL and yield its NDJSON result lines.
+
+    Each request body is small and fully sent before its results are read,
+    so neither side can block on a full socket buffer.
+    """
+    body = "".join(json.dumps({"command": command}) + "\n" for command in commands)
+    response = get_http_session().post(
+        f"{url}/commands/batch",
+        data=body.encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+        stream=True,
+        timeout=(10, None)
+    )
+    if response.status_code != 200:
+        print(f"❌ Import failed: {response.status_code} {response.text[:200]}", file=sys.stderr)
+        sys.exit(1)
+    for line in response.iter_lines(decode_unicode=True):
+        if line:
+            yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a file of commands into ArcOS")
+    parser.add_argument("path", help="CSV or JSONL file of commands")
+    parser.add_argument("--url", default="http://localhost:5000", help="ArcOS base URL")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Input format (default: by extension)")
+    parser.add_argument("--out", help="Write NDJSON results here instead of stdout")
+    parser.add_argument("--header", action=argparse.BooleanOptionalAction, default=True,
+                        help="Whether the CSV's first row is a header (default: yes)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Commands per request")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    out = open(args.out, "w") if args.out else sys.stdout
+
+    print(f"📥 Importing {args.path} ({fmt}) into {args.url}", file=sys.stderr)
+    started = time.perf_counter()
+    counts = {"ok": 0, "error": 0}
+    offset = 0
+
+    # The file is read lazily and sent a batch at a time, so huge files never sit in memory
+    with open(args.path, encoding="utf-8", newline="") as f:
+        commands = iter_commands(f, fmt, args.header)
+        while True:
+            batch = list(islice(commands, args.batch_size))
+            if not batch:
+                break
+            for result in _post_batch(args.url, batch):
+                result["index"] += offset
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                counts["error" if result.get("error") else "ok"] += 1
+            offset += len(batch)
+
+    elapsed = time.perf_counter() - started
+    total = counts["ok"] + counts["error"]
+    print(f"🏁 {total} commands in {elapsed:.1f}s ({total / elapsed:.1f}/s) - "
+          f"{counts['ok']} ok, {counts['error']} errors", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+ArcOS Benchmark
+Starts main.py or simplearcos.py against local fake OpenAI/Notion/Make.com
+services and drives its endpoints at set concurrency levels, e.g.
+
+    python benchmark.py --app main --concurrency 1,8,32 --requests 200
+    python benchmark.py --app simplearcos --endpoints command,status --error-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from fake_services import FakeServices, ServiceProfile
+
+SAMPLE_COMMANDS = [
+    "Log 30 minute workout",
+    "Write an article about AI",
+    "Track $50 grocery expense",
+    "Learn Python Flask",
+    "Plan next week",
+    "Call the plumber",
+]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+def build_request(endpoint, i):
+    """(method, path, json body) for the i-th request to an endpoint"""
+    if endpoint == "command":
+        # A unique suffix keeps the routing cache from turning every call into a hit
+        command = f"{SAMPLE_COMMANDS[i % len(SAMPLE_COMMANDS)]} #{i}"
+        return "POST", "/command", {"command": command}
+    if endpoint == "specialist":
+        pillar = ["content", "health", "finance", "training", "tasks"][i % 5]
+        return "POST", f"/specialist/{pillar}", {"question": f"Give me one tip #{i}"}
+    if endpoint == "status":
+        return "GET", "/status", None
+    raise ValueError(f"Unknown endpoint {endpoint}")
+
+
+def run_level(base_url, endpoint, concurrency, total, offset=0):
+    """Fire total requests with concurrency workers; return latency/error summary"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+
+    def one(i):
+        method, path, body = build_request(endpoint, offset + i)
+        started = time.perf_counter()
+        try:
+            response = session.request(method, base_url + path, json=body, timeout=60)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(ms for ms, _ in results)
+    errors = sum(1 for _, ok in results if not ok)
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": total,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50), 1),
+        "p95_ms": round(_percentile(latencies, 0.95), 1),
+        "p99_ms": round(_percentile(latencies, 0.99), 1),
+        "error_rate": round(errors / total, 4)
+    }
+
+
+def _stage_delta(before, after):
+    """Per-service calls/errors during one run, from the fakes' counters"""
+    delta = {}
+    for service, stats in after.items():
+        calls = stats["calls"] - before[service]["calls"]
+        errors = stats["errors"] - before[service]["errors"]
+        delta[service] = {
+            "calls": calls,
+            "error_rate": round(errors / calls, 4) if calls else 0.0,
+            "avg_ms": stats["avg_ms"]
+        }
+    return delta
+
+
+def start_app(app, env, port):
+    """Launch the app in its own process group and wait for /healthz"""
+    process = subprocess.Popen(
+        [sys.executable, f"{app}.py"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, **env, "PORT": str(port)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/healthz", timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError(f"{app}.py exited with code {process.returncode}")
+        time.sleep(0.2)
+
+    stop_app(process)
+    raise RuntimeError(f"{app}.py did not become healthy within 30s")
+
+
+def stop_app(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def print_table(rows):
+    header = f"{'endpoint':<12}{'conc':>6}{'reqs':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'err%':>8}   stages"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        stages = " ".join(
+            f"{name}:{stage['calls']}@{stage['error_rate'] * 100:.0f}%"
+            for name, stage in row["stages"].items() if stage["calls"]
+        )
+        print(f"{row['endpoint']:<12}{row['concurrency']:>6}{row['requests']:>7}{row['rps']:>9}"
+              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['error_rate'] * 100:>7.1f}%   {stages}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ArcOS against local fake services")
+    parser.add_argument("--app", choices=["main", "simplearcos"], default="main")
+    parser.add_argument("--url", help="Benchmark an already running app instead of starting one")
+    parser.add_argument("--endpoints", default="command,specialist,status")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated levels")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per level")
+    parser.add_argument("--openai-latency", type=float, default=400)
+    parser.add_argument("--notion-latency", type=float, default=250)
+    parser.add_argument("--make-latency", type=float, default=150)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Injected failure rate for every fake")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    if args.app == "simplearcos" and "specialist" in endpoints:
+        endpoints.remove("specialist")  # simplearcos has no specialist endpoint
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    fakes = FakeServices(profiles={
+        "openai": ServiceProfile(args.openai_latency, args.openai_latency / 5, args.error_rate),
+        "notion": ServiceProfile(args.notion_latency, args.notion_latency / 5, args.error_rate, 429),
+        "make": ServiceProfile(args.make_latency, args.make_latency / 5, args.error_rate),
+    }).start()
+
+    process = None
+    workdir = tempfile.mkdtemp(prefix="arcos-bench-")
+    try:
+        if args.url:
+            base_url = args.url.rstrip("/")
+        else:
+            port = _free_port()
+            env = {
+                **fakes.env(),
+                "ARCOS_QUEUE_DB": os.path.join(workdir, "queue.db"),
+                "SIMPLE_ARCOS_QUEUE_DB": os.path.join(workdir, "simple_queue.db"),
+                "ARCOS_ROUTING_CACHE_PATH": os.path.join(workdir, "routing_cache.json"),
+                "ARCOS_WEBHOOK_DEAD_LETTER": os.path.join(workdir, "dead_letter.jsonl"),
+                "ARCOS_INBOUND_DEAD_LETTER": os.path.join(workdir, "inbound_dead_letter.jsonl"),
+                # Fresh idempotency stores, or a rerun within the dedupe window replays every /command
+                "ARCOS_IDEMPOTENCY_DB": os.path.join(workdir, "idempotency.db"),
+                "SIMPLE_ARCOS_IDEMPOTENCY_DB": os.path.join(workdir, "simple_idempotency.db"),
+                "ARCOS_MIRROR_DB": os.path.join(workdir, "mirror.db"),
+                "ARCOS_PIPELINE_DB": os.path.join(workdir, "pipeline.db"),
+                "ARCOS_INBOUND_WEBHOOK_DB": os.path.join(workdir, "inbound_webhooks.db"),
+            }
+            print(f"🚀 Starting {args.app}.py on port {port} against fakes at {fakes.base_url}")
+            process = start_app(args.app, env, port)
+            base_url = f"http://127.0.0.1:{port}"
+
+        rows = []
+        for endpoint in endpoints:
+            for concurrency in levels:
+                before = fakes.stats()
+                row = run_level(base_url, endpoint, concurrency, args.requests, offset=len(rows) * args.requests)
+                row["stages"] = _stage_delta(before, fakes.stats())
+                rows.append(row)
+                print(f"  {endpoint} @ {concurrency}: {row['rps']} rps, p95 {row['p95_ms']} ms")
+
+        print()
+        print_table(rows)
+
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"app": args.app, "results": rows}, f, indent=2)
+            print(f"\n📝 Wrote {args.json}")
+
+    finally:
+        if process:
+            stop_app(process)
+        fakes.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+ArcOS Clients
+One process-wide, connection-pooled Notion, OpenAI and HTTP client each,
+built on first use (and rebuilt after a fork) so CLI tools start fast and
+every module reuses the same keep-alive connections:
+
+    from clients import notion, openai_client
+    notion.pages.create(...)
+    openai_client.chat.completions.create(...)
+
+Pools are tuned with ARCOS_{NOTION,OPENAI,HTTP}_POOL_SIZE, ARCOS_KEEPALIVE_SECONDS,
+ARCOS_NOTION_TIMEOUT and ARCOS_OPENAI_TIMEOUT.
+"""
+
+import os
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# The openai and notion_client packages are imported inside the builders:
+# openai alone takes a few hundred milliseconds to import
+
+_clients = {}  # (kind, key) -> (pid, client)
+_lock = threading.Lock()
+
+
+def _limits(pool_env, default):
+    size = int(os.getenv(pool_env, default))
+    return httpx.Limits(
+        max_connections=size,
+        max_keepalive_connections=size,
+        keepalive_expiry=float(os.getenv("ARCOS_KEEPALIVE_SECONDS", 30))
+    )
+
+
+def _get(kind, key, build):
+    """The cached client for this process, building it on first use or after a fork"""
+    pid = os.getpid()
+    entry = _clients.get((kind, key))
+    if entry and entry[0] == pid:
+        return entry[1]
+    with _lock:
+        entry = _clients.get((kind, key))
+        if entry is None or entry[0] != pid:
+            entry = _clients[(kind, key)] = (pid, build())
+        return entry[1]
+
+
+def get_notion(api_key=None):
+    """Pooled Notion client (NOTION_API_KEY unless another token is given)"""
+    api_key = api_key or os.getenv("NOTION_API_KEY")
+    timeout = float(os.getenv("ARCOS_NOTION_TIMEOUT", 30))
+
+    def build():
+        from notion_client import Client
+        http_client = httpx.Client(limits=_limits("ARCOS_NOTION_POOL_SIZE", 10), timeout=timeout)
+        return Client(
+            client=http_client,
+            auth=api_key,
+            base_url=os.getenv("NOTION_BASE_URL", "https://api.notion.com"),
+            timeout_ms=int(timeout * 1000)
+        )
+    return _get("notion", api_key, build)
+
+
+def get_openai():
+    """Pooled synchronous OpenAI client (OPENAI_API_KEY / OPENAI_BASE_URL)"""
+    timeout = float(os.getenv("ARCOS_OPENAI_TIMEOUT", 60))
+
+    def build():
+        import openai
+        return openai.OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            timeout=timeout,
+            http_client=openai.DefaultHttpxClient(limits=_limits("ARCOS_OPENAI_POOL_SIZE", 20), timeout=timeout)
+        )
+    return _get("openai", None, build)
+
+
+def get_async_openai():
+    """Pooled AsyncOpenAI client; use it from one event loop per process"""
+    timeout = float(os.getenv("ARCOS_OPENAI_TIMEOUT", 60))
+
+    def build():
+        import openai
+        return openai.AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            timeout=timeout,
+            http_client=openai.DefaultAsyncHttpxClient(limits=_limits("ARCOS_OPENAI_POOL_SIZE", 20), timeout=timeout)
+        )
+    return _get("async_openai", None, build)
+
+
+def get_http_session():
+    """Pooled requests session for webhooks and other plain HTTP"""
+    def build():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=int(os.getenv("ARCOS_HTTP_POOL_SIZE", 20)))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    return _get("http", None, build)
+
+
+class _Lazy:
+    """Stands in for a client at import time and resolves it on first attribute access"""
+
+    def __init__(self, factory):
+        self._factory = factory
+
+    def __getattr__(self, name):
+        return getattr(self._factory(), name)
+
+
+notion = _Lazy(get_notion)
+openai_client = _Lazy(get_openai)
+async_openai_client = _Lazy(get_async_openai)
+
+
+def _httpx_pool(client):
+    pool = getattr(client._transport, "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    return {
+        "open": len(connections),
+        "idle": sum(1 for c in connections if c.is_idle()),
+        "max": getattr(pool, "_max_connections", None)
+    }
+
+
+def _requests_pool(session):
+    adapter = session.get_adapter("https://")
+    pools = [adapter.poolmanager.pools[key] for key in adapter.poolmanager.pools.keys()]
+    return {
+        "hosts": len(pools),
+        "open": sum(p.num_connections for p in pools),
+        "idle": sum(1 for p in pools if p.pool for conn in list(p.pool.queue) if conn is not None),
+        "requests": sum(p.num_requests for p in pools),
+        "max_per_host": adapter._pool_maxsize
+    }
+
+
+def stats():
+    """Connection pool utilization for the clients this process has built"""
+    pid = os.getpid()
+    report = {}
+    with _lock:
+        entries = [(kind, key, client) for (kind, key), (owner, client) in _clients.items() if owner == pid]
+    for kind, key, client in entries:
+        name = kind if key is None or key == os.getenv("NOTION_API_KEY") else f"{kind}:{key[-4:]}"
+        try:
+            if kind == "notion":
+                report[name] = _httpx_pool(client.client)
+            elif kind in ("openai", "async_openai"):
+                report[name] = _httpx_pool(client._client)
+            else:
+                report[name] = _requests_pool(client)
+        except Exception as e:
+            report[name] = {"error": str(e)}
+    return report
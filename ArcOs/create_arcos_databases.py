@@ -1,356 +1,356 @@
 #!/usr/bin/env python3
 """
-Create ArcOS Databases - Fixed Version
-Sets up all 5 core databases for the ArcOS system
+Create ArcOS Databases
+Provisions the ArcOS workspace page and its 5 core databases from the
+declarative specs below. Safe to re-run: existing databases are found and
+brought up to date instead of duplicated. Databases are created concurrently
+under one Notion rate limiter per integration, and many workspaces can be
+provisioned in one run:
+
+    python create_arcos_databases.py
+    python create_arcos_databases.py --dry-run
+    python create_arcos_databases.py --workspaces workspaces.json --concurrency 4
+
+workspaces.json is a list of {"name", "parent_page_id"?, "api_key_env"?}.
 """
 
+import argparse
+import json
 import os
-from notion_client import Client
-from dotenv import load_dotenv
-
-load_dotenv()
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
-notion = Client(auth=os.getenv("NOTION_API_KEY"))
-
-
-def get_parent_page():
-    """Get or create a parent page for databases"""
-    try:
-        print("📄 Creating ArcOS workspace page...")
-        response = notion.pages.create(
-            parent={"type": "workspace", "workspace": True},
-            properties={
-                "title": {
-                    "title": [{"type": "text", "text": {"content": "ArcOS Workspace"}}]
-                }
-            },
-            children=[
-                {
-                    "object": "block",
-                    "type": "heading_1",
-                    "heading_1": {
-                        "rich_text": [{"type": "text", "text": {"content": "ArcOS Database Hub"}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [{"type": "text", "text": {
-                            "content": "All ArcOS databases for personal automation and intelligence."}}]
-                    }
-                }
-            ]
-        )
-
-        page_id = response["id"]
-        print(f"✅ Created ArcOS workspace page: {page_id}")
-        return page_id
-
-    except Exception as e:
-        print(f"❌ Error creating workspace page: {e}")
-        print("\n🔧 Manual Setup Required:")
-        print("1. Create a new page in Notion called 'ArcOS Workspace'")
-        print("2. Copy the page ID from the URL")
-        print("3. Enter it below:")
-
-        page_id = input("Enter page ID (32 characters): ").strip()
-        if len(page_id) == 32:
-            return page_id
-        else:
-            print("❌ Invalid page ID")
-            return None
-
-
-def create_tasks_database(parent_page_id):
-    """Create the Tasks database"""
-    print("📋 Creating Tasks Database...")
-
-    try:
-        response = notion.databases.create(
-            parent={"type": "page_id", "page_id": parent_page_id},
-            title=[{"type": "text", "text": {"content": "Tasks"}}],
-            properties={
-                "Title": {"title": {}},
-                "Status": {
-                    "select": {
-                        "options": [
-                            {"name": "New", "color": "gray"},
-                            {"name": "In Progress", "color": "yellow"},
-                            {"name": "Completed", "color": "green"},
-                            {"name": "Blocked", "color": "red"}
-                        ]
-                    }
-                },
-                "Pillar": {
-                    "select": {
-                        "options": [
-                            {"name": "Content", "color": "blue"},
-                            {"name": "Health", "color": "green"},
-                            {"name": "Finance", "color": "yellow"},
-                            {"name": "Training", "color": "purple"},
-                            {"name": "Operations", "color": "orange"}
-                        ]
-                    }
-                },
-                "Priority": {
-                    "select": {
-                        "options": [
-                            {"name": "High", "color": "red"},
-                            {"name": "Medium", "color": "yellow"},
-                            {"name": "Low", "color": "gray"}
-                        ]
-                    }
-                },
-                "Created": {"date": {}},
-                "Notes": {"rich_text": {}}
-            }
-        )
-
-        db_id = response['id']
-        print(f"✅ Tasks Database: {db_id}")
-        return db_id
-
-    except Exception as e:
-        print(f"❌ Tasks Database error: {e}")
-        return None
-
-
-def create_content_database(parent_page_id):
-    """Create the Content database"""
-    print("📝 Creating Content Database...")
-
-    try:
-        response = notion.databases.create(
-            parent={"type": "page_id", "page_id": parent_page_id},
-            title=[{"type": "text", "text": {"content": "Content"}}],
-            properties={
-                "Title": {"title": {}},
-                "Status": {
-                    "select": {
-                        "options": [
-                            {"name": "Idea", "color": "gray"},
-                            {"name": "Draft", "color": "orange"},
-                            {"name": "Review", "color": "purple"},
-                            {"name": "Published", "color": "green"},
-                            {"name": "AI Generated", "color": "blue"}
-                        ]
-                    }
-                },
-                "Content Type": {
-                    "select": {
-                        "options": [
-                            {"name": "Article", "color": "blue"},
-                            {"name": "Blog Post", "color": "green"},
-                            {"name": "Social Post", "color": "yellow"},
-                            {"name": "Email", "color": "purple"}
-                        ]
-                    }
-                },
-                "Word Count": {"number": {}},
-                "Topic": {"rich_text": {}},
-                "Created": {"date": {}}
-            }
-        )
-
-        db_id = response['id']
-        print(f"✅ Content Database: {db_id}")
-        return db_id
-
-    except Exception as e:
-        print(f"❌ Content Database error: {e}")
-        return None
+from dotenv import load_dotenv
 
+from clients import get_notion
+from notion_scheduler import NotionWriteScheduler
 
-def create_health_database(parent_page_id):
-    """Create the Health database"""
-    print("💪 Creating Health Database...")
-
-    try:
-        response = notion.databases.create(
-            parent={"type": "page_id", "page_id": parent_page_id},
-            title=[{"type": "text", "text": {"content": "Health"}}],
-            properties={
-                "Title": {"title": {}},
-                "Activity Type": {
-                    "select": {
-                        "options": [
-                            {"name": "Workout", "color": "red"},
-                            {"name": "Cardio", "color": "orange"},
-                            {"name": "Strength", "color": "purple"},
-                            {"name": "Walk", "color": "blue"},
-                            {"name": "Sleep", "color": "gray"}
-                        ]
-                    }
-                },
-                "Duration": {"number": {}},
-                "Date": {"date": {}},
-                "Notes": {"rich_text": {}}
-            }
-        )
-
-        db_id = response['id']
-        print(f"✅ Health Database: {db_id}")
-        return db_id
-
-    except Exception as e:
-        print(f"❌ Health Database error: {e}")
-        return None
-
+load_dotenv()
 
-def create_finance_database(parent_page_id):
-    """Create the Finance database"""
-    print("💰 Creating Finance Database...")
-
-    try:
-        response = notion.databases.create(
-            parent={"type": "page_id", "page_id": parent_page_id},
-            title=[{"type": "text", "text": {"content": "Finance"}}],
-            properties={
-                "Title": {"title": {}},
-                "Category": {
-                    "select": {
-                        "options": [
-                            {"name": "Income", "color": "green"},
-                            {"name": "Expense", "color": "red"},
-                            {"name": "Investment", "color": "blue"},
-                            {"name": "Budget", "color": "orange"}
-                        ]
-                    }
-                },
-                "Amount": {"number": {"format": "dollar"}},
-                "Date": {"date": {}},
-                "Notes": {"rich_text": {}}
-            }
-        )
-
-        db_id = response['id']
-        print(f"✅ Finance Database: {db_id}")
-        return db_id
-
-    except Exception as e:
-        print(f"❌ Finance Database error: {e}")
+WORKSPACE_TITLE = "ArcOS Workspace"
+
+
+def _select(*options):
+    return {"select": {"options": [{"name": name, "color": color} for name, color in options]}}
+
+
+# pillar -> database title and Notion property schema
+DATABASE_SPECS = {
+    'tasks': {
+        "title": "Tasks",
+        "properties": {
+            "Title": {"title": {}},
+            "Status": _select(("New", "gray"), ("In Progress", "yellow"), ("Completed", "green"), ("Blocked", "red")),
+            "Pillar": _select(("Content", "blue"), ("Health", "green"), ("Finance", "yellow"),
+                              ("Training", "purple"), ("Operations", "orange")),
+            "Priority": _select(("High", "red"), ("Medium", "yellow"), ("Low", "gray")),
+            "Created": {"date": {}},
+            "Notes": {"rich_text": {}}
+        }
+    },
+    'content': {
+        "title": "Content",
+        "properties": {
+            "Title": {"title": {}},
+            "Status": _select(("Idea", "gray"), ("Draft", "orange"), ("Review", "purple"),
+                              ("Published", "green"), ("AI Generated", "blue")),
+            "Content Type": _select(("Article", "blue"), ("Blog Post", "green"), ("Social Post", "yellow"),
+                                    ("Email", "purple")),
+            "Word Count": {"number": {}},
+            "Topic": {"rich_text": {}},
+            "Created": {"date": {}}
+        }
+    },
+    'health': {
+        "title": "Health",
+        "properties": {
+            "Title": {"title": {}},
+            "Activity Type": _select(("Workout", "red"), ("Cardio", "orange"), ("Strength", "purple"),
+                                     ("Walk", "blue"), ("Sleep", "gray")),
+            "Duration": {"number": {}},
+            "Date": {"date": {}},
+            "Notes": {"rich_text": {}}
+        }
+    },
+    'finance': {
+        "title": "Finance",
+        "properties": {
+            "Title": {"title": {}},
+            "Category": _select(("Income", "green"), ("Expense", "red"), ("Investment", "blue"), ("Budget", "orange")),
+            "Amount": {"number": {"format": "dollar"}},
+            "Date": {"date": {}},
+            "Notes": {"rich_text": {}}
+        }
+    },
+    'training': {
+        "title": "Training",
+        "properties": {
+            "Title": {"title": {}},
+            "Skill Area": _select(("Technical", "blue"), ("Business", "green"), ("Creative", "purple"),
+                                  ("Personal", "yellow")),
+            "Status": _select(("Not Started", "gray"), ("In Progress", "yellow"), ("Completed", "green")),
+            "Progress": {"number": {"format": "percent"}},
+            "Start Date": {"date": {}},
+            "Notes": {"rich_text": {}}
+        }
+    }
+}
+
+WORKSPACE_CHILDREN = [
+    {
+        "object": "block",
+        "type": "heading_1",
+        "heading_1": {"rich_text": [{"type": "text", "text": {"content": "ArcOS Database Hub"}}]}
+    },
+    {
+        "object": "block",
+        "type": "paragraph",
+        "paragraph": {"rich_text": [{"type": "text", "text": {
+            "content": "All ArcOS databases for personal automation and intelligence."}}]}
+    }
+]
+
+
+def diff_schema(spec_properties, existing_properties):
+    """Compare a spec with a retrieved database's properties.
+
+    Returns (additions, conflicts): the property payloads to add (missing
+    properties, and select properties missing options, sent with their
+    existing options kept), and human-readable type conflicts, which are
+    reported but never changed automatically.
+    """
+    additions = {}
+    conflicts = []
+    for name, spec in spec_properties.items():
+        prop_type = next(iter(spec))
+        if prop_type == "title":
+            continue  # every database has exactly one title property, whatever its name
+
+        existing = existing_properties.get(name)
+        if existing is None:
+            additions[name] = spec
+        elif existing["type"] != prop_type:
+            conflicts.append(f"{name}: is {existing['type']}, spec says {prop_type}")
+        elif prop_type == "select":
+            current = existing["select"].get("options", [])
+            known = {option["name"] for option in current}
+            missing = [option for option in spec["select"]["options"] if option["name"] not in known]
+            if missing:
+                kept = [{"name": option["name"], "color": option.get("color", "default")} for option in current]
+                additions[name] = {"select": {"options": kept + missing}}
+    return additions, conflicts
+
+
+class WorkspaceProvisioner:
+    """Idempotently provisions one ArcOS workspace through a shared scheduler"""
+
+    def __init__(self, notion, scheduler, name="default", parent_page_id=None, specs=DATABASE_SPECS, dry_run=False):
+        self.notion = notion
+        self.scheduler = scheduler
+        self.name = name
+        self.parent_page_id = parent_page_id
+        self.specs = specs
+        self.dry_run = dry_run
+
+    def _call(self, fn, **kwargs):
+        """Every Notion call, reads included, counts against the integration's rate limit"""
+        return self.scheduler.call(fn, **kwargs)
+
+    def find_workspace_page(self):
+        """An existing top-level ArcOS workspace page, if the integration can see one"""
+        response = self._call(self.notion.search, query=WORKSPACE_TITLE,
+                              filter={"property": "object", "value": "page"})
+        for page in response.get("results", []):
+            title = page.get("properties", {}).get("title", {}).get("title", [])
+            if page.get("parent", {}).get("type") == "workspace" and \
+                    "".join(t.get("plain_text", "") for t in title) == WORKSPACE_TITLE:
+                return page["id"]
         return None
 
+    def ensure_workspace_page(self):
+        """Return the parent page id, creating the workspace page if needed"""
+        if self.parent_page_id:
+            return self.parent_page_id
 
-def create_training_database(parent_page_id):
-    """Create the Training database"""
-    print("🎓 Creating Training Database...")
-
-    try:
-        response = notion.databases.create(
-            parent={"type": "page_id", "page_id": parent_page_id},
-            title=[{"type": "text", "text": {"content": "Training"}}],
-            properties={
-                "Title": {"title": {}},
-                "Skill Area": {
-                    "select": {
-                        "options": [
-                            {"name": "Technical", "color": "blue"},
-                            {"name": "Business", "color": "green"},
-                            {"name": "Creative", "color": "purple"},
-                            {"name": "Personal", "color": "yellow"}
-                        ]
-                    }
-                },
-                "Status": {
-                    "select": {
-                        "options": [
-                            {"name": "Not Started", "color": "gray"},
-                            {"name": "In Progress", "color": "yellow"},
-                            {"name": "Completed", "color": "green"}
-                        ]
-                    }
-                },
-                "Progress": {"number": {"format": "percent"}},
-                "Start Date": {"date": {}},
-                "Notes": {"rich_text": {}}
-            }
-        )
-
-        db_id = response['id']
-        print(f"✅ Training Database: {db_id}")
-        return db_id
-
-    except Exception as e:
-        print(f"❌ Training Database error: {e}")
-        return None
-
+        page_id = self.find_workspace_page()
+        if page_id:
+            print(f"📄 [{self.name}] Using existing workspace page: {page_id}")
+        elif self.dry_run:
+            print(f"📄 [{self.name}] Would create the workspace page")
+        else:
+            response = self._call(
+                self.notion.pages.create,
+                parent={"type": "workspace", "workspace": True},
+                properties={"title": {"title": [{"type": "text", "text": {"content": WORKSPACE_TITLE}}]}},
+                children=WORKSPACE_CHILDREN
+            )
+            page_id = response["id"]
+            print(f"✅ [{self.name}] Created workspace page: {page_id}")
+
+        self.parent_page_id = page_id
+        return page_id
 
-def create_env_file(database_ids):
+    def existing_databases(self, page_id):
+        """Title -> database id for the databases already under the page"""
+        databases = {}
+        cursor = None
+        while True:
+            kwargs = {"block_id": page_id, "page_size": 100}
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            response = self._call(self.notion.blocks.children.list, **kwargs)
+            for block in response.get("results", []):
+                if block.get("type") == "child_database":
+                    databases[block["child_database"]["title"]] = block["id"]
+            if not response.get("has_more"):
+                return databases
+            cursor = response.get("next_cursor")
+
+    def ensure_database(self, pillar, page_id, existing):
+        """Create one database, or diff and update the existing one"""
+        spec = self.specs[pillar]
+        try:
+            db_id = existing.get(spec["title"])
+            if db_id is None:
+                if self.dry_run or page_id is None:
+                    return {"id": None, "action": "would_create"}
+                response = self._call(
+                    self.notion.databases.create,
+                    parent={"type": "page_id", "page_id": page_id},
+                    title=[{"type": "text", "text": {"content": spec["title"]}}],
+                    properties=spec["properties"]
+                )
+                return {"id": response["id"], "action": "created"}
+
+            database = self._call(self.notion.databases.retrieve, database_id=db_id)
+            additions, conflicts = diff_schema(spec["properties"], database["properties"])
+            result = {"id": db_id, "action": "unchanged", "changes": sorted(additions), "conflicts": conflicts}
+            if additions:
+                if self.dry_run:
+                    result["action"] = "would_update"
+                else:
+                    self._call(self.notion.databases.update, database_id=db_id, properties=additions)
+                    result["action"] = "updated"
+            return result
+
+        except Exception as e:
+            return {"id": None, "action": "failed", "error": str(e)}
+
+    def provision(self):
+        """Ensure the page and every database; {pillar: result}"""
+        try:
+            page_id = self.ensure_workspace_page()
+            existing = self.existing_databases(page_id) if page_id else {}
+        except Exception as e:
+            print(f"❌ [{self.name}] Workspace page error: {e}")
+            return {pillar: {"id": None, "action": "failed", "error": str(e)} for pillar in self.specs}
+
+        # The databases don't depend on each other, so they go out together
+        with ThreadPoolExecutor(max_workers=len(self.specs)) as executor:
+            futures = {pillar: executor.submit(self.ensure_database, pillar, page_id, existing)
+                       for pillar in self.specs}
+            results = {pillar: future.result() for pillar, future in futures.items()}
+
+        for pillar, result in results.items():
+            icon = "❌" if result["action"] == "failed" else "✅"
+            detail = result.get("error") or ", ".join(result.get("changes", [])) or result["id"] or ""
+            print(f"{icon} [{self.name}] {self.specs[pillar]['title']}: {result['action']} {detail}")
+            for conflict in result.get("conflicts", []):
+                print(f"⚠️  [{self.name}] {self.specs[pillar]['title']} {conflict}")
+        return results
+
+
+def create_env_file(database_ids, path='.env.arcos', api_key_env="NOTION_API_KEY"):
     """Create .env file with database IDs"""
-    print("\n📝 Creating environment configuration...")
-
     env_content = f"""# ArcOS Environment Configuration
-NOTION_API_KEY={os.getenv('NOTION_API_KEY', 'your_notion_token')}
+NOTION_API_KEY={os.getenv(api_key_env, 'your_notion_token')}
 OPENAI_API_KEY={os.getenv('OPENAI_API_KEY', 'your_openai_key')}
 
 # Database IDs
-TASKS_DB_ID={database_ids.get('tasks', 'not_created')}
-CONTENT_DB_ID={database_ids.get('content', 'not_created')}
-HEALTH_DB_ID={database_ids.get('health', 'not_created')}
-FINANCE_DB_ID={database_ids.get('finance', 'not_created')}
-TRAINING_DB_ID={database_ids.get('training', 'not_created')}
+TASKS_DB_ID={database_ids.get('tasks') or 'not_created'}
+CONTENT_DB_ID={database_ids.get('content') or 'not_created'}
+HEALTH_DB_ID={database_ids.get('health') or 'not_created'}
+FINANCE_DB_ID={database_ids.get('finance') or 'not_created'}
+TRAINING_DB_ID={database_ids.get('training') or 'not_created'}
 
 # Server
 PORT=5000
 """
 
-    with open('.env.arcos', 'w') as f:
+    with open(path, 'w') as f:
         f.write(env_content)
 
-    print("✅ Created .env.arcos file")
+    print(f"✅ Created {path}")
+
+
+def provision_workspaces(workspaces, concurrency=4, dry_run=False, write_env=False):
+    """Provision many workspaces; workspaces sharing an integration share its rate limiter"""
+    schedulers = {}
+    provisioners = []
+    for workspace in workspaces:
+        api_key_env = workspace.get("api_key_env", "NOTION_API_KEY")
+        if api_key_env not in schedulers:
+            notion = get_notion(os.getenv(api_key_env))
+            schedulers[api_key_env] = NotionWriteScheduler(
+                notion, rate=float(os.getenv("NOTION_RATE_LIMIT", 3)), dispatchers=3
+            )
+        scheduler = schedulers[api_key_env]
+        provisioners.append(WorkspaceProvisioner(
+            scheduler.notion, scheduler,
+            name=workspace.get("name", "default"),
+            parent_page_id=workspace.get("parent_page_id"),
+            dry_run=dry_run
+        ))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        all_results = dict(zip(
+            [p.name for p in provisioners],
+            executor.map(WorkspaceProvisioner.provision, provisioners)
+        ))
+
+    if write_env and not dry_run:
+        for workspace, provisioner in zip(workspaces, provisioners):
+            database_ids = {pillar: result["id"] for pillar, result in all_results[provisioner.name].items()}
+            suffix = "arcos" if len(workspaces) == 1 else provisioner.name
+            create_env_file(database_ids, f".env.{suffix}", workspace.get("api_key_env", "NOTION_API_KEY"))
+
+    return all_results
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Create or update the ArcOS Notion databases")
+    parser.add_argument("--workspaces", help="JSON file listing the workspaces to provision")
+    parser.add_argument("--parent-page-id", help="Provision under this page instead of a workspace page")
+    parser.add_argument("--concurrency", type=int, default=4, help="Workspaces provisioned at once")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--write-env", action="store_true", help="Write .env.<name> files with the database ids")
+    args = parser.parse_args()
+
     print("🚀 ArcOS Database Setup")
     print("=" * 40)
 
-    # Check API key
-    if not os.getenv("NOTION_API_KEY"):
-        print("❌ NOTION_API_KEY not found")
+    if args.workspaces:
+        with open(args.workspaces) as f:
+            workspaces = json.load(f)
+    else:
+        workspaces = [{"name": "default", "parent_page_id": args.parent_page_id}]
+
+    missing_keys = {w.get("api_key_env", "NOTION_API_KEY") for w in workspaces} - set(os.environ)
+    if missing_keys:
+        print(f"❌ Missing Notion tokens: {', '.join(sorted(missing_keys))}")
         print("Add your Notion integration token to .env file")
-        return
-
-    # Test connection
-    try:
-        notion.search(filter={"property": "object", "value": "database"})
-        print("✅ Notion connection successful")
-    except Exception as e:
-        print(f"❌ Notion connection failed: {e}")
-        return
-
-    # Get parent page
-    parent_page_id = get_parent_page()
-    if not parent_page_id:
-        print("❌ Cannot create parent page")
-        return
-
-    print(f"\n🏗️  Creating databases in page: {parent_page_id}")
-
-    # Create all databases
-    database_ids = {}
-    database_ids['tasks'] = create_tasks_database(parent_page_id)
-    database_ids['content'] = create_content_database(parent_page_id)
-    database_ids['health'] = create_health_database(parent_page_id)
-    database_ids['finance'] = create_finance_database(parent_page_id)
-    database_ids['training'] = create_training_database(parent_page_id)
-
-    # Create env file
-   #create_env_file(database_ids)
+        sys.exit(1)
+
+    all_results = provision_workspaces(workspaces, args.concurrency, args.dry_run, args.write_env)
 
     # Summary
-    successful = [k for k, v in database_ids.items() if v]
-    print(f"\n🎉 Created {len(successful)}/5 databases successfully!")
-
-    if len(successful) == 5:
-        print("\n📋 Next Steps:")
-        print("1. Rename .env.arcos to .env")
-        print("2. Add your OpenAI API key")
-        print("3. Run: python arcos.py")
-    else:
-        print(f"⚠️  {5 - len(successful)} databases failed - check errors above")
+    total = sum(len(results) for results in all_results.values())
+    failed = sum(1 for results in all_results.values() for r in results.values() if r["action"] == "failed")
+    print(f"\n🎉 {total - failed}/{total} databases ready across {len(all_results)} workspace(s)")
+    if failed:
+        print(f"⚠️  {failed} databases failed - check errors above")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
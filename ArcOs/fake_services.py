@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+ArcOS Fake Services
+Local stand-ins for OpenAI, Notion and Make.com with configurable latency
+and error injection, for offline benchmarks. One server, routed by prefix:
+
+    OPENAI_BASE_URL=http://127.0.0.1:<port>/openai/v1
+    NOTION_BASE_URL=http://127.0.0.1:<port>/notion
+    MAKE_WEBHOOK_URL=http://127.0.0.1:<port>/make/hook
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Every property the ArcOS apps write, so schema filtering keeps them all
+FAKE_SCHEMA = {
+    "Title": "title", "Created": "date", "Date": "date", "Start Date": "date",
+    "Status": "select", "Priority": "select", "Pillar": "select", "Content Type": "select",
+    "Activity Type": "select", "Category": "select", "Skill Area": "select",
+    "Topic": "rich_text", "Notes": "rich_text",
+    "Word Count": "number", "Duration": "number", "Amount": "number", "Progress": "number"
+}
+
+FAKE_ROUTING = {
+    "pillar": "tasks",
+    "action": "create_task",
+    "title": "Benchmark task",
+    "data": {"description": "benchmark"},
+    "automation": True
+}
+
+FAKE_ADVICE = ("Start with a short warm-up, keep the main block focused, "
+               "and finish by writing down one thing to improve next time.")
+
+
+class ServiceProfile:
+    """Latency and error injection for one fake service"""
+
+    def __init__(self, latency_ms=100, jitter_ms=20, error_rate=0.0, error_status=500):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.calls = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def delay(self):
+        return max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+
+    def should_fail(self):
+        return random.random() < self.error_rate
+
+    def record(self, seconds, failed):
+        with self._lock:
+            self.calls += 1
+            self.errors += int(failed)
+            self.busy_seconds += seconds
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "avg_ms": round(self.busy_seconds / self.calls * 1000, 1) if self.calls else None
+            }
+
+
+class FakeServices:
+    """Runs the fake OpenAI/Notion/Make.com server on a background thread"""
+
+    def __init__(self, host="127.0.0.1", port=0, profiles=None):
+        self.profiles = profiles or {
+            "openai": ServiceProfile(latency_ms=400, jitter_ms=80),
+            "notion": ServiceProfile(latency_ms=250, jitter_ms=50, error_status=429),
+            "make": ServiceProfile(latency_ms=150, jitter_ms=30),
+        }
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """Environment variables that point an ArcOS app at these fakes"""
+        env = {
+            "OPENAI_API_KEY": "sk-fake",
+            "OPENAI_BASE_URL": f"{self.base_url}/openai/v1",
+            "NOTION_API_KEY": "secret_fake",
+            "NOTION_BASE_URL": f"{self.base_url}/notion",
+            "MAKE_WEBHOOK_URL": f"{self.base_url}/make/hook",
+        }
+        for pillar in ["TASKS", "CONTENT", "HEALTH", "FINANCE", "TRAINING"]:
+            env[f"{pillar}_DB_ID"] = f"fake-{pillar.lower()}-db"
+        return env
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-services", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self):
+        return {name: profile.stats() for name, profile in self.profiles.items()}
+
+    def _handler(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+            def _send(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _route(self, method):
+                body = self._body() if method in ("POST", "PATCH") else {}
+                service = self.path.split("/")[1]
+                profile = services.profiles.get(service)
+                if profile is None:
+                    return self._send(404, {"error": "unknown service"})
+
+                started = time.perf_counter()
+                time.sleep(profile.delay())
+                failed = profile.should_fail()
+                try:
+                    if failed:
+                        headers = {"Retry-After": "1"} if profile.error_status == 429 else None
+                        return self._send(profile.error_status, {
+                            "object": "error", "status": profile.error_status,
+                            "code": "rate_limited" if profile.error_status == 429 else "internal_server_error",
+                            "message": "Injected failure"
+                        }, headers)
+                    handler = getattr(self, f"_{service}")
+                    return handler(method, body)
+                finally:
+                    profile.record(time.perf_counter() - started, failed)
+
+            def _openai(self, method, body):
+                if self.path.endswith("/embeddings"):
+                    vector = [random.random() for _ in range(16)]
+                    return self._send(200, {"object": "list", "model": "fake",
+                                            "data": [{"object": "embedding", "index": 0, "embedding": vector}],
+                                            "usage": {"prompt_tokens": 4, "total_tokens": 4}})
+
+                system = next((m["content"] for m in body.get("messages", []) if m["role"] == "system"), "")
+                content = json.dumps(FAKE_ROUTING) if "Quarterback" in system else FAKE_ADVICE
+                schema_name = (body.get("response_format") or {}).get("json_schema", {}).get("name")
+                if schema_name == "route_batch":
+                    user = body["messages"][-1]["content"]
+                    count = sum(1 for line in user.splitlines() if line[:1].isdigit())
+                    content = json.dumps({"results": [FAKE_ROUTING] * count})
+
+                if body.get("stream"):
+                    return self._stream_completion(content)
+
+                return self._send(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion",
+                    "created": int(time.time()), "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": 120, "completion_tokens": 40, "total_tokens": 160}
+                })
+
+            def _stream_completion(self, content):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for word in content.split(" "):
+                    chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk",
+                             "created": int(time.time()), "model": "fake",
+                             "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(0.01)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def _notion(self, method, body):
+                parts = self.path.split("?")[0].strip("/").split("/")  # notion, v1, resource, id...
+                resource = parts[2] if len(parts) > 2 else ""
+                if resource == "databases" and method == "GET":
+                    properties = {name: {"id": name, "name": name, "type": prop_type, prop_type: {}}
+                                  for name, prop_type in FAKE_SCHEMA.items()}
+                    return self._send(200, {"object": "database", "id": parts[3], "properties": properties})
+                if resource == "databases" and parts[-1] == "query":
+                    return self._send(200, {"object": "list", "results": [], "has_more": False, "next_cursor": None})
+                if resource == "databases":  # create (POST) or update (PATCH)
+                    db_id = parts[3] if len(parts) > 3 else str(uuid.uuid4())
+                    return self._send(200, {"object": "database", "id": db_id,
+                                            "properties": body.get("properties", {})})
+                if resource == "pages":
+                    page_id = parts[3] if len(parts) > 3 else str(uuid.uuid4())
+                    now = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+                    return self._send(200, {"object": "page", "id": page_id,
+                                            "url": f"https://www.notion.so/{page_id.replace('-', '')}",
+                                            "created_time": now, "last_edited_time": now,
+                                            "parent": body.get("parent"),
+                                            "properties": body.get("properties", {})})
+                return self._send(200, {"object": "list", "results": []})
+
+            def _make(self, method, body):
+                return self._send(200, {"accepted": True})
+
+            def do_GET(self):
+                if self.path == "/_stats":
+                    return self._send(200, services.stats())
+                self._route("GET")
+
+            def do_POST(self):
+                self._route("POST")
+
+            def do_PATCH(self):
+                self._route("PATCH")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run fake OpenAI/Notion/Make.com services")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--openai-latency", type=float, default=400)
+    parser.add_argument("--notion-latency", type=float, default=250)
+    parser.add_argument("--make-latency", type=float, default=150)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fakes = FakeServices(port=args.port, profiles={
+        "openai": ServiceProfile(args.openai_latency, args.openai_latency / 5, args.error_rate),
+        "notion": ServiceProfile(args.notion_latency, args.notion_latency / 5, args.error_rate, 429),
+        "make": ServiceProfile(args.make_latency, args.make_latency / 5, args.error_rate),
+    }).start()
+
+    print(f"🧪 Fake services on {fakes.base_url}")
+    for key, value in fakes.env().items():
+        print(f"{key}={value}")
+    try:
+        fakes.thread.join()
+    except KeyboardInterrupt:
+        fakes.stop()
+
+
+if __name__ == "__main__":
+    main()
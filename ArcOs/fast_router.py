@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+ArcOS Fast Router
+Local weighted keyword/regex classifier that lets the quarterback skip the
+LLM for commands it can route with high confidence
+"""
+
+import re
+import threading
+import time
+from collections import deque
+
+
+# pillar -> action, automation flag, title prefix and weighted patterns.
+# Weights are per-pattern evidence in [0, 1]; a pillar's score combines them
+# as a noisy-OR so several weak hits add up without exceeding 1. Patterns
+# match word stems so inflected forms ("Learning", "3 workouts") count too.
+PILLAR_RULES = {
+    'content': {
+        "action": "generate_content",
+        "automation": True,
+        "prefix": "Content",
+        "patterns": [
+            (r'\b(writ|wrot|draft)\w*', 0.7),
+            (r'\b(article|blog|newsletter)\w*', 0.9),
+            (r'\b(content|post(s|ed|ing)?)\b', 0.6),
+        ]
+    },
+    'health': {
+        "action": "log_activity",
+        "automation": False,
+        "prefix": "Health",
+        "patterns": [
+            (r'\b(workout|exercis|cardio|gym)\w*', 0.9),
+            (r'\b(ran|run(s|ning)?|jog\w*|walk\w*)\b', 0.7),
+            (r'\b(health|fitness)\w*', 0.6),
+            (r'\b\d+\s*(min|mins|minute|minutes)\b', 0.4),
+        ]
+    },
+    'finance': {
+        "action": "track_expense",
+        "automation": False,
+        "prefix": "Finance",
+        "patterns": [
+            (r'\$\s?\d', 0.8),
+            (r'\b(expens|budget)\w*', 0.9),
+            (r'\b(spen[dt]|buy|bought|cost|paid)\w*', 0.6),
+        ]
+    },
+    'training': {
+        "action": "schedule_learning",
+        "automation": False,
+        "prefix": "Training",
+        "patterns": [
+            (r'\b(learn|stud(y|ie|yi)|course)\w*', 0.9),
+            (r'\b(skill|train|practi[cs])\w*', 0.6),
+        ]
+    }
+}
+
+DURATION_RE = re.compile(r'(\d+)\s*(?:min|mins|minute|minutes)\b', re.IGNORECASE)
+AMOUNT_RE = re.compile(r'\$\s?(\d+(?:\.\d{1,2})?)')
+
+
+class KeywordClassifier:
+    """Compiled weighted regex classifier returning (analysis, confidence)"""
+
+    def __init__(self, rules=PILLAR_RULES):
+        self.rules = rules
+        self.compiled = {
+            pillar: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in rule["patterns"]]
+            for pillar, rule in rules.items()
+        }
+
+    def scores(self, command):
+        """Noisy-OR score per pillar"""
+        scores = {}
+        for pillar, patterns in self.compiled.items():
+            miss = 1.0
+            for regex, weight in patterns:
+                if regex.search(command):
+                    miss *= 1 - weight
+            scores[pillar] = 1 - miss
+        return scores
+
+    def classify(self, command):
+        """Return the routing decision and a confidence in [0, 1]"""
+        scores = self.scores(command)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        pillar, top = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+
+        if top == 0:
+            return self.build_analysis('tasks', command), 0.0
+
+        # Penalise ambiguity between the two best pillars
+        confidence = top * (1 - runner_up)
+        return self.build_analysis(pillar, command), round(confidence, 3)
+
+    def build_analysis(self, pillar, command):
+        """Routing decision for a pillar with data extracted from the command"""
+        if pillar == 'tasks':
+            return {
+                "pillar": "tasks",
+                "action": "create_task",
+                "title": command,
+                "data": {"description": command},
+                "automation": False
+            }
+
+        rule = self.rules[pillar]
+        if pillar == 'content':
+            data = {"topic": command, "word_count": 500}
+        elif pillar == 'health':
+            duration = DURATION_RE.search(command)
+            data = {"activity": command, "duration": int(duration.group(1)) if duration else 30}
+        elif pillar == 'finance':
+            amount = AMOUNT_RE.search(command)
+            data = {"description": command}
+            if amount:
+                data["amount"] = float(amount.group(1))
+        else:
+            data = {"skill": command}
+
+        return {
+            "pillar": pillar,
+            "action": rule["action"],
+            "title": f"{rule['prefix']}: {command}",
+            "data": data,
+            "automation": rule["automation"]
+        }
+
+
+class TierStats:
+    """Hit counts and latency samples per routing tier"""
+
+    def __init__(self, sample_size=1000):
+        self.sample_size = sample_size
+        self.hits = {}
+        self.latencies = {}
+        self._lock = threading.Lock()
+
+    def record(self, tier, started):
+        """Record a hit for tier; started is a time.perf_counter() value"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.hits[tier] = self.hits.get(tier, 0) + 1
+            self.latencies.setdefault(tier, deque(maxlen=self.sample_size)).append(elapsed_ms)
+
+    def stats(self):
+        with self._lock:
+            total = sum(self.hits.values())
+            tiers = {}
+            for tier, hits in self.hits.items():
+                samples = sorted(self.latencies[tier])
+                tiers[tier] = {
+                    "hits": hits,
+                    "hit_rate": round(hits / total, 3),
+                    "p50_ms": round(samples[len(samples) // 2], 2),
+                    "p95_ms": round(samples[min(int(len(samples) * 0.95), len(samples) - 1)], 2)
+                }
+            return {"total": total, "tiers": tiers}
@@ -4,36 +4,39 @@ Quick fix for ArcOS database schema issues
 """
 
 import os
-from notion_client import Client
 from dotenv import load_dotenv
 
+import clients
+from notion_payloads import PayloadRegistry
+from notion_schema import SchemaCache, is_schema_error
+from notion_scheduler import NotionWriteScheduler
+
 load_dotenv()
-notion = Client(auth=os.getenv("NOTION_API_KEY"))
+notion = clients.notion
+schema_cache = SchemaCache(notion, ttl=int(os.getenv("ARCOS_SCHEMA_TTL", 300)))
+notion_writer = NotionWriteScheduler(notion, rate=float(os.getenv("NOTION_RATE_LIMIT", 3)))
+
+DATABASES = {
+    'tasks': os.getenv("TASKS_DB_ID"),
+    'content': os.getenv("CONTENT_DB_ID"),
+    'health': os.getenv("HEALTH_DB_ID"),
+    'finance': os.getenv("FINANCE_DB_ID"),
+    'training': os.getenv("TRAINING_DB_ID")
+}
+
+payloads = PayloadRegistry(schema_cache, DATABASES)
 
 
 def get_database_properties(db_id):
-    """Get the actual properties of a database"""
-    try:
-        db = notion.databases.retrieve(db_id)
-        properties = {}
-        for prop_name, prop_info in db['properties'].items():
-            properties[prop_name] = prop_info['type']
-        return properties
-    except Exception as e:
-        print(f"Error getting database properties: {e}")
-        return {}
+    """Get the actual properties of a database (cached)"""
+    return schema_cache.get(db_id)
 
 
 def create_safe_notion_task(pillar, title, data):
     """Create task with only properties that exist in the database"""
+    db_id = None
     try:
-        db_id = {
-            'tasks': os.getenv("TASKS_DB_ID"),
-            'content': os.getenv("CONTENT_DB_ID"),
-            'health': os.getenv("HEALTH_DB_ID"),
-            'finance': os.getenv("FINANCE_DB_ID"),
-            'training': os.getenv("TRAINING_DB_ID")
-        }.get(pillar)
+        db_id = DATABASES.get(pillar)
 
         if not db_id:
             return {"error": f"Database not configured for {pillar}"}
@@ -42,68 +45,12 @@ def create_safe_notion_task(pillar, title, data):
         db_props = get_database_properties(db_id)
         print(f"Available properties for {pillar}: {list(db_props.keys())}")
 
-        # Start with just the title (which should always exist)
-        properties = {}
-
-        # Add Title (required)
-        if 'Title' in db_props:
-            properties["Title"] = {"title": [{"text": {"content": title}}]}
-        elif 'title' in db_props:
-            properties["title"] = {"title": [{"text": {"content": title}}]}
-
-        # Add other properties only if they exist in the database
-        if pillar == 'content':
-            if 'Status' in db_props:
-                properties["Status"] = {"select": {"name": "Idea"}}
-            if 'Content Type' in db_props:
-                properties["Content Type"] = {"select": {"name": "Article"}}
-            if 'Topic' in db_props:
-                properties["Topic"] = {"rich_text": [{"text": {"content": data.get('topic', '')}}]}
-            if 'Word Count' in db_props:
-                properties["Word Count"] = {"number": data.get('word_count', 0)}
-
-        elif pillar == 'health':
-            if 'Activity Type' in db_props:
-                properties["Activity Type"] = {"select": {"name": "Workout"}}
-            if 'Duration' in db_props and db_props['Duration'] == 'number':
-                # Extract number from duration data
-                duration = data.get('duration', 30)
-                if isinstance(duration, str):
-                    # Try to extract number from string like "45 minutes"
-                    import re
-                    numbers = re.findall(r'\d+', duration)
-                    duration = int(numbers[0]) if numbers else 30
-                properties["Duration"] = {"number": duration}
-            if 'Date' in db_props:
-                properties["Date"] = {"date": {"start": "2024-01-15"}}
-
-        elif pillar == 'finance':
-            if 'Category' in db_props:
-                properties["Category"] = {"select": {"name": "Expense"}}
-            if 'Amount' in db_props:
-                properties["Amount"] = {"number": data.get('amount', 0)}
-            if 'Date' in db_props:
-                properties["Date"] = {"date": {"start": "2024-01-15"}}
-
-        elif pillar == 'training':
-            if 'Skill Area' in db_props:
-                properties["Skill Area"] = {"select": {"name": "Technical"}}
-            if 'Status' in db_props:
-                properties["Status"] = {"select": {"name": "Not Started"}}
-            if 'Progress' in db_props:
-                properties["Progress"] = {"number": 0}
-
-        elif pillar == 'tasks':
-            if 'Status' in db_props:
-                properties["Status"] = {"select": {"name": "New"}}
-            if 'Priority' in db_props:
-                properties["Priority"] = {"select": {"name": "Medium"}}
-            if 'Pillar' in db_props:
-                properties["Pillar"] = {"select": {"name": "Operations"}}
+        # The pillar template already drops properties the database doesn't have
+        properties = payloads.build(pillar, title, data)
 
         print(f"Creating with properties: {properties}")
 
-        response = notion.pages.create(
+        response = notion_writer.create_page(
             parent={"database_id": db_id},
             properties=properties
         )
@@ -112,23 +59,17 @@ def create_safe_notion_task(pillar, title, data):
 
     except Exception as e:
         print(f"Notion error: {e}")
+        if db_id and is_schema_error(e):
+            schema_cache.invalidate(db_id)
         return {"error": str(e)}
 
 
 def test_all_databases():
     """Test what properties each database actually has"""
-    databases = {
-        'tasks': os.getenv("TASKS_DB_ID"),
-        'content': os.getenv("CONTENT_DB_ID"),
-        'health': os.getenv("HEALTH_DB_ID"),
-        'finance': os.getenv("FINANCE_DB_ID"),
-        'training': os.getenv("TRAINING_DB_ID")
-    }
-
     print("🔍 Checking Database Schemas:")
     print("=" * 40)
 
-    for pillar, db_id in databases.items():
+    for pillar, db_id in DATABASES.items():
         if db_id:
             props = get_database_properties(db_id)
             print(f"\n{pillar.upper()} Database:")
@@ -140,6 +81,7 @@ def test_all_databases():
 
 if __name__ == "__main__":
     print("🔧 ArcOS Database Schema Checker")
+    schema_cache.warm(DATABASES)
     test_all_databases()
 
     print("\n🧪 Testing Safe Task Creation:")
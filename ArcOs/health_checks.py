@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+ArcOS Health Checks
+Checks the pillar databases concurrently and caches the results so /status
+probes don't each cost five Notion round-trips
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DatabaseHealthMonitor:
+    """Cached, concurrently refreshed database connectivity checks"""
+
+    def __init__(self, notion, databases, ttl=30, connected="Connected",
+                 not_configured="Not Configured", format_error=None):
+        self.notion = notion
+        self.databases = databases
+        self.ttl = ttl
+        # Status strings shown for each database
+        self.connected = connected
+        self.not_configured = not_configured
+        self.format_error = format_error or (lambda e: f"Error: {str(e)[:50]}")
+
+        self._results = None
+        self._checked_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _check(self, db_id):
+        try:
+            self.notion.databases.retrieve(db_id)
+            return self.connected
+        except Exception as e:
+            return self.format_error(e)
+
+    def refresh(self):
+        """Check every configured database at the same time"""
+        configured = {pillar: db_id for pillar, db_id in self.databases.items() if db_id}
+        results = {pillar: self.not_configured for pillar, db_id in self.databases.items() if not db_id}
+
+        if configured:
+            with ThreadPoolExecutor(max_workers=len(configured)) as executor:
+                checks = dict(zip(configured, executor.map(self._check, configured.values())))
+            results.update(checks)
+
+        with self._lock:
+            self._results = results
+            self._checked_at = time.time()
+            self._refreshing = False
+        return results
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name="db-health-refresh", daemon=True).start()
+
+    def status(self):
+        """Return (results, age in seconds); stale results trigger a background refresh"""
+        with self._lock:
+            results, checked_at = self._results, self._checked_at
+
+        if results is None:
+            results = self.refresh()
+            checked_at = self._checked_at
+        elif time.time() - checked_at > self.ttl:
+            self._refresh_in_background()
+
+        return dict(results), round(time.time() - checked_at, 1)
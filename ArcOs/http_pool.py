@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+ArcOS HTTP Pool
+Background dispatcher that takes Make.com webhook delivery off the request
+path, over the shared keep-alive session from clients.py
+"""
+
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import requests
+
+from clients import get_http_session
+from metrics import registry as metrics
+
+
+class WebhookDispatcher:
+    """Delivers webhooks from a bounded pool of threads with retries and a dead-letter file"""
+
+    def __init__(self, concurrency=4, max_retries=4, base_backoff=1.0, timeout=10,
+                 max_queue=10000, dead_letter_path="webhook_dead_letter.jsonl"):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.timeout = timeout
+        self.dead_letter_path = dead_letter_path
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = []
+        self._lock = threading.Lock()
+        self.counters = {
+            "queued": 0,
+            "delivered": 0,
+            "retries": 0,
+            "dead_lettered": 0,
+            "delivery_seconds": 0.0
+        }
+
+    def _ensure_started(self):
+        """Start delivery threads on first use"""
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(len(self._threads), self.concurrency):
+                thread = threading.Thread(target=self._deliver_loop, name=f"webhook-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def dispatch(self, url, payload):
+        """Queue a webhook and return its delivery id immediately"""
+        self._ensure_started()
+        delivery = {"id": uuid.uuid4().hex, "url": url, "payload": payload, "attempts": 0}
+        try:
+            self._queue.put_nowait(delivery)
+        except queue.Full:
+            self._dead_letter(delivery, "dispatch queue full")
+            return delivery["id"]
+
+        self._count("queued")
+        return delivery["id"]
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        counters["pending"] = self._queue.qsize()
+        delivered = counters["delivered"]
+        counters["avg_delivery_ms"] = round(counters["delivery_seconds"] / delivered * 1000, 1) if delivered else None
+        return counters
+
+    def shutdown(self, timeout=30):
+        """Wait for queued deliveries to drain"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.1)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _deliver_loop(self):
+        while True:
+            delivery = self._queue.get()
+            try:
+                self._deliver(delivery)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, delivery):
+        session = get_http_session()
+        while True:
+            delivery["attempts"] += 1
+            started = time.perf_counter()
+            try:
+                response = session.post(delivery["url"], json=delivery["payload"], timeout=self.timeout)
+                if response.status_code < 300:
+                    self._count("delivered")
+                    self._count("delivery_seconds", time.perf_counter() - started)
+                    metrics.observe("arcos_stage_duration_seconds", time.perf_counter() - started,
+                                    stage="make_delivery")
+                    return
+                error = f"HTTP {response.status_code}"
+                retryable = response.status_code == 429 or response.status_code >= 500
+            except requests.RequestException as e:
+                error = str(e)
+                retryable = True
+
+            if not retryable or delivery["attempts"] > self.max_retries:
+                self._dead_letter(delivery, error)
+                return
+
+            self._count("retries")
+            metrics.inc("arcos_retries_total", service="make")
+            time.sleep(random.uniform(0, self.base_backoff * (2 ** (delivery["attempts"] - 1))))
+
+    def _dead_letter(self, delivery, error):
+        """Append an undeliverable webhook to the dead-letter file"""
+        self._count("dead_lettered")
+        metrics.inc("arcos_stage_errors_total", stage="make_delivery")
+        print(f"📭 Webhook {delivery['id']} dead-lettered: {error}")
+        record = {**delivery, "error": error, "failed_at": datetime.now().isoformat()}
+        with self._lock:
+            with open(self.dead_letter_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+ArcOS Idempotency Store
+Remembers the result of each command for a window so a retried request
+(same Idempotency-Key, or the same command text) gets the original result
+back instead of a second Notion page and Make.com run. Bounded LRU in memory
+in front of a SQLite file shared by every worker process.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from routing_cache import normalize_command
+
+
+def request_key(idempotency_key, command, scope="command"):
+    """(key, ttl kind): an explicit key, else a hash of the normalized command"""
+    if idempotency_key:
+        return f"{scope}:key:{idempotency_key}", "key"
+    digest = hashlib.sha256(normalize_command(command).encode()).hexdigest()
+    return f"{scope}:hash:{digest}", "hash"
+
+
+class IdempotencyStore:
+    """Key -> stored result, with at-most-once execution across threads and processes"""
+
+    def __init__(self, db_path="arcos_idempotency.db", key_ttl=86400, hash_ttl=600,
+                 max_entries=10000, lease_seconds=120):
+        self.db_path = db_path
+        self.ttls = {"key": key_ttl, "hash": hash_ttl}
+        self.max_entries = max_entries
+        self.lease_seconds = lease_seconds
+
+        self._memory = OrderedDict()  # key -> (expires_at, result)
+        self._in_flight = {}          # key -> threading.Event, this process only
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counters = {"executed": 0, "replayed": 0, "waited": 0, "not_stored": 0}
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _init_db(self):
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                result TEXT
+            )
+        """)
+        self._connect().execute("CREATE INDEX IF NOT EXISTS idx_results_expiry ON results (expires_at)")
+
+    def _remember(self, key, expires_at, result):
+        with self._lock:
+            self._memory[key] = (expires_at, result)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _from_memory(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > time.time():
+                self._memory.move_to_end(key)
+                return entry[1]
+            self._memory.pop(key, None)
+        return None
+
+    def run(self, key, kind, fn, cacheable=lambda result: True, wait_timeout=60):
+        """Return (result, replayed). fn runs at most once per key while its result is stored"""
+        if not self.ttls[kind]:
+            return fn(), False  # this kind of deduplication is switched off
+
+        result = self._from_memory(key)
+        if result is not None:
+            self._count("replayed")
+            return result, True
+
+        # A retry racing the original in this process waits for it
+        with self._lock:
+            event = self._in_flight.get(key)
+            owner = event is None
+            if owner:
+                event = self._in_flight[key] = threading.Event()
+        if not owner:
+            event.wait(wait_timeout)
+            self._count("waited")
+            return self.run(key, kind, fn, cacheable, wait_timeout)
+
+        try:
+            stored = self._claim(key, wait_timeout)
+            if stored is not None:
+                self._count("replayed")
+                return stored, True
+
+            try:
+                result = fn()
+            except Exception:
+                self._release(key)
+                raise
+
+            self._count("executed")
+            if cacheable(result):
+                self._store(key, kind, result)
+            else:
+                self._count("not_stored")
+                self._release(key)
+            return result, False
+
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            event.set()
+
+    def _claim(self, key, wait_timeout):
+        """Take the key's lease in SQLite, or return the stored result.
+
+        Another process holding a live lease is waited on; an expired lease
+        (its owner died) is taken over.
+        """
+        conn = self._connect()
+        deadline = time.time() + wait_timeout
+        while True:
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT status, expires_at, result FROM results WHERE key = ?", (key,)).fetchone()
+            if row and row[1] > now:
+                conn.execute("COMMIT")
+                if row[0] == "done":
+                    result = json.loads(row[2])
+                    self._remember(key, row[1], result)
+                    return result
+                if now > deadline:
+                    raise TimeoutError(f"Request {key} is still being processed")
+                time.sleep(0.1)
+                continue
+
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, status, expires_at, result) VALUES (?, 'running', ?, NULL)",
+                (key, now + self.lease_seconds)
+            )
+            conn.execute("COMMIT")
+            return None
+
+    def _store(self, key, kind, result):
+        expires_at = time.time() + self.ttls[kind]
+        self._remember(key, expires_at, result)
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO results (key, status, expires_at, result) VALUES (?, 'done', ?, ?)",
+            (key, expires_at, json.dumps(result))
+        )
+        if self.counters["executed"] % 100 == 0:
+            self.prune()
+
+    def _release(self, key):
+        self._connect().execute("DELETE FROM results WHERE key = ? AND status = 'running'", (key,))
+
+    def prune(self):
+        """Drop expired rows, then the oldest beyond max_entries"""
+        conn = self._connect()
+        conn.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),))
+        conn.execute("""
+            DELETE FROM results WHERE key IN (
+                SELECT key FROM results ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            counters["memory_entries"] = len(self._memory)
+        counters["stored"] = self._connect().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return counters
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+ArcOS Inbound Webhooks
+Make.com callbacks are acknowledged immediately and applied to Notion in the
+background: retries of the same (page_id, action) are dropped, updates to
+the same page arriving close together become one pages.update, and the
+appliers have their own slice of the Notion rate limit so callback bursts
+don't starve /command. Failed updates are retried with backoff, then written
+to a dead-letter file: Make has already had its 202 and won't send them again.
+
+Pending updates live in a SQLite file, so every web worker process shares one
+dedupe window and one coalescing queue, and updates survive a restart.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from metrics import registry as metrics
+from notion_scheduler import TokenBucket
+
+
+class InboundWebhookQueue:
+    """Deduplicating, per-page coalescing queue of Notion property updates"""
+
+    def __init__(self, update_page, db_path="arcos_inbound_webhooks.db", dedupe_window=300, coalesce_seconds=2.0,
+                 rate=1.0, max_pending=10000, max_retries=5, base_backoff=1.0,
+                 dead_letter_path="inbound_webhook_dead_letter.jsonl", lease_seconds=60, poll_interval=0.5):
+        self.update_page = update_page  # fn(page_id=..., properties=...)
+        self.db_path = db_path
+        self.dedupe_window = dedupe_window
+        self.coalesce_seconds = coalesce_seconds
+        self.bucket = TokenBucket(rate, max(1, int(rate)))
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.dead_letter_path = dead_letter_path
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._thread_pid = None
+        self._in_flight = 0
+        self._flush = False
+        self.counters = {
+            "received": 0,
+            "duplicates": 0,
+            "coalesced": 0,
+            "rejected": 0,
+            "applied": 0,
+            "retries": 0,
+            "dead_lettered": 0
+        }
+        self._init_db()
+
+    def _connect(self):
+        """One connection per thread (and per process after a fork)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                page_id TEXT NOT NULL,
+                action TEXT NOT NULL,
+                received_at REAL NOT NULL,
+                PRIMARY KEY (page_id, action)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_received ON seen (received_at)")
+        # version changes whenever an update is merged in, so an applier
+        # knows whether what it sent is still everything pending for the page
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pending (
+                page_id TEXT PRIMARY KEY,
+                properties TEXT NOT NULL,
+                actions TEXT NOT NULL,
+                ready_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                version INTEGER NOT NULL DEFAULT 0,
+                lease_until REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_pending_ready ON pending (ready_at)")
+
+    def start(self):
+        """Run this process's applier thread"""
+        with self._cond:
+            if self._thread and self._thread.is_alive() and self._thread_pid == os.getpid():
+                return self
+            self._thread = threading.Thread(target=self._work_loop, name="inbound-webhooks", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+        return self
+
+    def submit(self, page_id, action, properties):
+        """Queue an update; returns "queued", "coalesced", "duplicate" or "rejected" """
+        self.start()
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM seen WHERE received_at < ?", (now - self.dedupe_window,))
+            if conn.execute("SELECT 1 FROM seen WHERE page_id = ? AND action = ?", (page_id, action)).fetchone():
+                result = "duplicate"
+            else:
+                row = conn.execute("SELECT properties, actions FROM pending WHERE page_id = ?", (page_id,)).fetchone()
+                if row is None and conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0] >= self.max_pending:
+                    result = "rejected"
+                else:
+                    conn.execute("INSERT INTO seen (page_id, action, received_at) VALUES (?, ?, ?)",
+                                 (page_id, action, now))
+                    if row is None:
+                        conn.execute(
+                            "INSERT INTO pending (page_id, properties, actions, ready_at) VALUES (?, ?, ?, ?)",
+                            (page_id, json.dumps(properties), json.dumps([action]), now + self.coalesce_seconds)
+                        )
+                        result = "queued"
+                    else:
+                        # The latest value for a property wins
+                        merged = {**json.loads(row[0]), **properties}
+                        conn.execute(
+                            "UPDATE pending SET properties = ?, actions = ?, version = version + 1 WHERE page_id = ?",
+                            (json.dumps(merged), json.dumps(json.loads(row[1]) + [action]), page_id)
+                        )
+                        result = "coalesced"
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+        with self._cond:
+            self.counters["received"] += 1
+            if result != "queued":
+                self.counters["duplicates" if result == "duplicate" else result] += 1
+            self._cond.notify()
+        return result
+
+    def stats(self):
+        """This process's counters, plus the pending count shared by all of them"""
+        with self._cond:
+            counters = dict(self.counters)
+        counters["pending"] = self._connect().execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+        return counters
+
+    def shutdown(self, timeout=30):
+        """Apply everything still pending without waiting out the coalesce delay"""
+        deadline = time.time() + timeout
+        with self._cond:
+            self._flush = True
+            self._cond.notify()
+        while time.time() < deadline:
+            with self._cond:
+                idle = not self._in_flight
+            if idle and not self._connect().execute("SELECT 1 FROM pending LIMIT 1").fetchone():
+                return
+            time.sleep(0.1)
+
+    def _claim(self):
+        """Lease the page due soonest, or return (None, seconds until the next one is due)"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            ready_by = float("inf") if self._flush else now
+            row = conn.execute(
+                "SELECT page_id, properties, actions, attempts, version FROM pending "
+                "WHERE ready_at <= ? AND (lease_until IS NULL OR lease_until < ?) ORDER BY ready_at LIMIT 1",
+                (ready_by, now)
+            ).fetchone()
+            if row is None:
+                next_ready = conn.execute(
+                    "SELECT MIN(ready_at) FROM pending WHERE lease_until IS NULL OR lease_until < ?", (now,)
+                ).fetchone()[0]
+                conn.execute("COMMIT")
+                wait = self.poll_interval if next_ready is None else next_ready - now
+                return None, min(max(wait, 0.01), self.poll_interval)
+            conn.execute("UPDATE pending SET lease_until = ? WHERE page_id = ?", (now + self.lease_seconds, row[0]))
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        page_id, properties, actions, attempts, version = row
+        return {"page_id": page_id, "properties": json.loads(properties), "actions": json.loads(actions),
+                "attempts": attempts, "version": version}, 0
+
+    def _work_loop(self):
+        while True:
+            try:
+                entry, wait = self._claim()
+            except sqlite3.Error as e:
+                print(f"Inbound webhook queue error: {e}")
+                entry, wait = None, self.poll_interval
+            if entry is None:
+                with self._cond:
+                    self._cond.wait(wait)
+                continue
+
+            with self._cond:
+                self._in_flight += 1
+            page_id = entry["page_id"]
+            self.bucket.acquire()
+            error = None
+            try:
+                with metrics.span("webhook_apply"):
+                    self.update_page(page_id=page_id, properties=entry["properties"])
+                print(f"✅ Updated page {page_id} ({', '.join(entry['actions'])})")
+            except Exception as e:
+                error = str(e)
+                print(f"Webhook update error for {page_id}: {e}")
+
+            try:
+                self._finish(entry, error)
+            except sqlite3.Error as e:
+                print(f"Inbound webhook queue error: {e}")  # the lease expires and it is retried
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _finish(self, entry, error):
+        """Drop an applied (or given-up) update, or schedule its retry"""
+        page_id = entry["page_id"]
+        conn = self._connect()
+        attempts = entry["attempts"] + (error is not None)
+        dead = error is not None and attempts > self.max_retries
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("SELECT version FROM pending WHERE page_id = ?", (page_id,)).fetchone()
+            if error is None or dead:
+                if version and version[0] == entry["version"]:
+                    conn.execute("DELETE FROM pending WHERE page_id = ?", (page_id,))
+                else:
+                    # Newer updates were merged in meanwhile; send the page again
+                    conn.execute("UPDATE pending SET lease_until = NULL, attempts = 0 WHERE page_id = ?", (page_id,))
+            else:
+                backoff = random.uniform(0, self.base_backoff * (2 ** (attempts - 1)))
+                conn.execute(
+                    "UPDATE pending SET lease_until = NULL, attempts = ?, ready_at = ? WHERE page_id = ?",
+                    (attempts, time.time() + backoff, page_id)
+                )
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+        if error is None:
+            self._count("applied")
+        elif dead:
+            self._dead_letter(entry, attempts, error)
+        else:
+            self._count("retries")
+            metrics.inc("arcos_retries_total", service="notion_webhook")
+
+    def _dead_letter(self, entry, attempts, error):
+        """Append an update that kept failing to the dead-letter file"""
+        metrics.inc("arcos_stage_errors_total", stage="webhook_apply")
+        print(f"📭 Webhook update for {entry['page_id']} dead-lettered: {error}")
+        record = {"page_id": entry["page_id"], "properties": entry["properties"], "actions": entry["actions"],
+                  "attempts": attempts, "error": error, "failed_at": datetime.now().isoformat()}
+        with self._cond:
+            self.counters["dead_lettered"] += 1
+            with open(self.dead_letter_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def _count(self, name):
+        with self._cond:
+            self.counters[name] += 1
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+ArcOS Job Queue
+Durable SQLite-backed queue between the HTTP endpoints and a pool of worker
+processes. Jobs are leased to workers and re-delivered if a worker dies, so
+delivery is at-least-once.
+"""
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+import uuid
+
+
+class QueueFull(Exception):
+    """Raised when the queue is past its depth limit"""
+
+
+class JobQueue:
+    """SQLite job queue with leases, retries and idempotency keys"""
+
+    def __init__(self, db_path, max_depth=1000, lease_seconds=300, max_attempts=5):
+        self.db_path = db_path
+        self.max_depth = max_depth
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    idempotency_key TEXT UNIQUE,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    enqueued_at REAL NOT NULL,
+                    lease_until REAL,
+                    started_at REAL,
+                    finished_at REAL,
+                    result TEXT,
+                    error TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, enqueued_at)")
+        finally:
+            conn.close()
+
+    def enqueue(self, payload, idempotency_key=None):
+        """Add a job. Returns (job, created); an existing key returns the original job"""
+        key = idempotency_key or uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT * FROM jobs WHERE idempotency_key = ?", (key,)).fetchone()
+            if row:
+                conn.execute("COMMIT")
+                return self._to_dict(row), False
+
+            depth = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'running')"
+            ).fetchone()[0]
+            if depth >= self.max_depth:
+                conn.execute("ROLLBACK")
+                raise QueueFull(f"Queue depth {depth} is at the limit of {self.max_depth}")
+
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, idempotency_key, payload, status, enqueued_at) "
+                "VALUES (?, ?, ?, 'pending', ?)",
+                (job_id, key, json.dumps(payload), time.time())
+            )
+            conn.execute("COMMIT")
+            return self.get(job_id), True
+        finally:
+            conn.close()
+
+    def claim(self):
+        """Lease the oldest pending (or lease-expired) job, or return None"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # A job whose worker died on every attempt is not handed out again
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, lease_until = NULL, "
+                "error = 'Lease expired after ' || attempts || ' attempts' "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' "
+                "OR (status = 'running' AND lease_until < ? AND attempts < ?) "
+                "ORDER BY enqueued_at LIMIT 1",
+                (now, self.max_attempts)
+            ).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, "
+                "lease_until = ?, started_at = ? WHERE id = ?",
+                (now + self.lease_seconds, now, row["id"])
+            )
+            conn.execute("COMMIT")
+            job = self._to_dict(row)
+            job["attempts"] += 1
+            return job
+        finally:
+            conn.close()
+
+    def complete(self, job_id, result):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = 'completed', finished_at = ?, result = ?, "
+                "lease_until = NULL WHERE id = ?",
+                (time.time(), json.dumps(result), job_id)
+            )
+        finally:
+            conn.close()
+
+    def fail(self, job_id, error):
+        """Return the job to the queue, or mark it failed after max_attempts"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "finished_at = CASE WHEN attempts >= ? THEN ? ELSE NULL END, "
+                "error = ?, lease_until = NULL WHERE id = ?",
+                (self.max_attempts, self.max_attempts, time.time(), str(error), job_id)
+            )
+        finally:
+            conn.close()
+
+    def get(self, job_id):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return self._to_dict(row) if row else None
+        finally:
+            conn.close()
+
+    def depth(self):
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'running')"
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def metrics(self, sample_size=1000):
+        """Queue depth plus queue-wait and processing latency of recent jobs"""
+        conn = self._connect()
+        try:
+            counts = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall())
+            recent = conn.execute(
+                "SELECT enqueued_at, started_at, finished_at FROM jobs "
+                "WHERE status = 'completed' ORDER BY finished_at DESC LIMIT ?",
+                (sample_size,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        waits = sorted(r["started_at"] - r["enqueued_at"] for r in recent)
+        runs = sorted(r["finished_at"] - r["started_at"] for r in recent)
+
+        return {
+            "depth": counts.get("pending", 0) + counts.get("running", 0),
+            "max_depth": self.max_depth,
+            "jobs": counts,
+            "queue_wait_ms": _percentiles(waits),
+            "processing_ms": _percentiles(runs)
+        }
+
+    def _to_dict(self, row):
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+def _percentiles(values):
+    if not values:
+        return {"p50": None, "p95": None}
+    return {
+        "p50": round(values[int(len(values) * 0.50)] * 1000, 1),
+        "p95": round(values[min(int(len(values) * 0.95), len(values) - 1)] * 1000, 1)
+    }
+
+
+def run_worker(db_path, handler, poll_interval=0.5):
+    """Worker loop: claim a job, run handler(payload), record the result"""
+    queue = JobQueue(db_path)
+    print(f"👷 Worker {os.getpid()} started")
+
+    while True:
+        job = queue.claim()
+        if not job:
+            time.sleep(poll_interval)
+            continue
+
+        try:
+            result = handler(job["payload"])
+            queue.complete(job["id"], result)
+        except Exception as e:
+            print(f"Worker {os.getpid()} job {job['id']} error: {e}")
+            queue.fail(job["id"], e)
+
+
+class WorkerPool:
+    """A configurable number of worker processes draining one queue"""
+
+    def __init__(self, db_path, handler, workers=2, poll_interval=0.5):
+        self.db_path = db_path
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.processes = []
+
+    def start(self):
+        ctx = multiprocessing.get_context("fork")
+        for _ in range(self.workers):
+            process = ctx.Process(
+                target=run_worker,
+                args=(self.db_path, self.handler, self.poll_interval),
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+
+    def stop(self, timeout=10):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join(timeout=timeout)
+        self.processes = []
+
+    def alive(self):
+        return sum(1 for process in self.processes if process.is_alive())
@@ -6,20 +6,48 @@ Integrates Notion, OpenAI, and Make.com for intelligent automation
 
 import os
 import json
-from flask import Flask, request, jsonify
-from notion_client import Client
-import openai
+import asyncio
+import io
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from flask import Flask, Response, request, jsonify, stream_with_context
 from dotenv import load_dotenv
-import requests
 from datetime import datetime
 
+from async_pipeline import AsyncCommandPipeline
+import clients
+from clients import openai_client, async_openai_client
+from idempotency import IdempotencyStore, request_key
+from job_queue import JobQueue, QueueFull, WorkerPool
+from notion_payloads import PayloadRegistry
+from notion_schema import SchemaCache, is_schema_error
+from notion_scheduler import NotionWriteScheduler
+from fast_router import KeywordClassifier, TierStats
+from routing_cache import RoutingCache
+from http_pool import WebhookDispatcher
+from inbound_webhooks import InboundWebhookQueue
+from notion_mirror import NotionMirror
+from health_checks import DatabaseHealthMonitor
+from batch_import import iter_commands
+from metrics import registry as metrics
+
 load_dotenv()
 
 app = Flask(__name__)
 
-# Initialize services
-notion = Client(auth=os.getenv("NOTION_API_KEY"))
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# Initialize services (shared pooled clients, built on first use)
+notion = clients.notion
+
+# All Notion writes are paced through one rate-limited queue
+notion_writer = NotionWriteScheduler(notion, rate=float(os.getenv("NOTION_RATE_LIMIT", 3)))
+
+# Make.com webhooks are delivered in the background over a pooled session
+webhook_dispatcher = WebhookDispatcher(
+    concurrency=int(os.getenv("ARCOS_WEBHOOK_CONCURRENCY", 4)),
+    dead_letter_path=os.getenv("ARCOS_WEBHOOK_DEAD_LETTER", "webhook_dead_letter.jsonl")
+)
 
 # Database IDs
 DATABASES = {
@@ -30,114 +58,362 @@ DATABASES = {
     'training': os.getenv("TRAINING_DB_ID")
 }
 
+# Database connectivity for /status, cached for ARCOS_STATUS_TTL seconds
+db_health = DatabaseHealthMonitor(
+    notion, DATABASES,
+    ttl=int(os.getenv("ARCOS_STATUS_TTL", 30)),
+    connected="✅ Connected",
+    not_configured="⚠️ Not Configured",
+    format_error=lambda e: "❌ Error"
+)
+
+# Database schemas, warmed at startup and used to drop unknown properties
+schema_cache = SchemaCache(notion, ttl=int(os.getenv("ARCOS_SCHEMA_TTL", 300)))
+
+# Inbound Make.com callbacks: action -> Notion properties to set on the page
+WEBHOOK_ACTIONS = {
+    'content_generated': {"Status": {"select": {"name": "AI Generated"}}}
+}
+# Local copy of the pillar databases, written through and synced incrementally
+notion_mirror = NotionMirror(
+    notion, DATABASES,
+    db_path=os.getenv("ARCOS_MIRROR_DB", "arcos_mirror.db"),
+    sync_interval=int(os.getenv("ARCOS_MIRROR_SYNC_INTERVAL", 60)),
+    scheduler=notion_writer
+)
+
+
+def update_notion_page(**kwargs):
+    """pages.update through the write scheduler, mirrored locally"""
+    page = notion_writer.update_page(**kwargs)
+    notion_mirror.record(page)
+    return page
+
+
+inbound_webhooks = InboundWebhookQueue(
+    update_notion_page,
+    db_path=os.getenv("ARCOS_INBOUND_WEBHOOK_DB", "arcos_inbound_webhooks.db"),
+    dedupe_window=int(os.getenv("ARCOS_WEBHOOK_DEDUPE_WINDOW", 300)),
+    coalesce_seconds=float(os.getenv("ARCOS_WEBHOOK_COALESCE_SECONDS", 2)),
+    rate=float(os.getenv("ARCOS_WEBHOOK_NOTION_RATE", 1)),
+    dead_letter_path=os.getenv("ARCOS_INBOUND_DEAD_LETTER", "inbound_webhook_dead_letter.jsonl")
+)
+
+# Per-pillar property templates, compiled against those schemas
+payloads = PayloadRegistry(schema_cache, DATABASES)
+
+
+# Routing model; needs structured-output (json_schema) support
+ROUTER_MODEL = os.getenv("ARCOS_ROUTER_MODEL", "gpt-4o-mini")
+# Output cap per routed command. A reply is ~50 tokens, ~130 when a long title
+# is echoed into topic and description; the rest is headroom, since a cut-off
+# reply is invalid JSON.
+ROUTE_MAX_TOKENS = int(os.getenv("ARCOS_ROUTE_MAX_TOKENS", 400))
+
+_NULLABLE_STRING = {"type": ["string", "null"]}
+_NULLABLE_NUMBER = {"type": ["number", "null"]}
+
+# Strict mode needs every key listed and required, so data carries the
+# fields the Notion payload templates read, null when the command has none
+ROUTING_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "pillar": {"type": "string", "enum": ["content", "health", "finance", "training", "tasks"]},
+        "action": {"type": "string", "enum": [
+            "create_task", "generate_content", "log_activity", "track_expense", "schedule_learning"
+        ]},
+        "title": {"type": "string"},
+        "data": {
+            "type": "object",
+            "properties": {
+                "topic": _NULLABLE_STRING,
+                "description": _NULLABLE_STRING,
+                "duration": _NULLABLE_NUMBER,
+                "amount": _NULLABLE_NUMBER,
+                "word_count": _NULLABLE_NUMBER
+            },
+            "required": ["topic", "description", "duration", "amount", "word_count"],
+            "additionalProperties": False
+        },
+        "automation": {"type": "boolean"}
+    },
+    "required": ["pillar", "action", "title", "data", "automation"],
+    "additionalProperties": False
+}
 
-class ArcOSQuarterback:
-    """The main AI quarterback that routes commands"""
+ROUTING_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "route", "strict": True, "schema": ROUTING_SCHEMA}
+}
 
-    def __init__(self):
-        self.system_prompt = """You are the ArcOS Quarterback - an intelligent personal operating system.
-
-Your job is to analyze user commands and determine:
-1. Which pillar this belongs to: content, health, finance, training, or general tasks
-2. What action to take: create_task, generate_content, log_activity, etc.
-3. Whether to trigger automation (true/false)
-
-Respond with JSON only:
-{
-    "pillar": "content|health|finance|training|tasks",
-    "action": "create_task|generate_content|log_activity|track_expense|schedule_learning",
-    "title": "descriptive title for the task",
-    "data": {"key": "value pairs of relevant data"},
-    "automation": true/false
+ROUTING_BATCH_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "route_batch", "strict": True, "schema": {
+        "type": "object",
+        "properties": {"results": {"type": "array", "items": ROUTING_SCHEMA}},
+        "required": ["results"],
+        "additionalProperties": False
+    }}
 }
 
+metrics.describe("arcos_route_replies_total", "LLM routing replies received")
+metrics.describe("arcos_route_parse_failures_total", "LLM routing replies that could not be used")
+metrics.describe("arcos_openai_wasted_tokens_total", "Tokens spent on routing replies that could not be used")
+metrics.describe("arcos_route_truncated_total", "LLM routing replies cut off at max_tokens")
+
+
+class ArcOSQuarterback:
+    """The main AI quarterback that routes commands"""
+
+    def __init__(self, fast_path_threshold=0.75, cache=None):
+        # Tier 1: local classifier; the LLM is only called below the threshold
+        self.classifier = KeywordClassifier()
+        self.fast_path_threshold = fast_path_threshold
+        self.tier_stats = TierStats()
+        # Routing decisions from earlier LLM calls
+        self.cache = cache or RoutingCache()
+
+        # Shared by single and batch routing; the output shape lives in ROUTING_SCHEMA
+        self.system_prompt = """You are the ArcOS Quarterback. Route each personal command to a pillar and action.
+Pillars: content, health, finance, training, tasks (everything else).
+Give a short task title. Set automation true only when the command asks for something to happen outside Notion.
+Put only values stated in the command in data; null the rest.
 Examples:
-- "Write an article about AI" → content pillar, generate_content action
-- "Log 30 minute workout" → health pillar, log_activity action  
-- "Track $50 grocery expense" → finance pillar, track_expense action
-- "Learn Python Flask" → training pillar, schedule_learning action"""
+"Write an article about AI" -> content, generate_content, topic "AI"
+"Log 30 minute workout" -> health, log_activity, duration 30
+"Track $50 grocery expense" -> finance, track_expense, amount 50
+"Learn Python Flask" -> training, schedule_learning"""
+
+    def _messages(self, command):
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": command}
+        ]
+
+    def _parse_analysis(self, response, stage):
+        """The schema-constrained reply as a dict, or None (counted as wasted tokens)"""
+        metrics.record_usage(stage, response.usage)
+        metrics.inc("arcos_route_replies_total", stage=stage)
+
+        choice = response.choices[0]
+        message = choice.message
+        if choice.finish_reason == "length":
+            metrics.inc("arcos_route_truncated_total", stage=stage)
+            print(f"QB {stage} reply truncated at max_tokens; raise ARCOS_ROUTE_MAX_TOKENS")
+        try:
+            if message.content and not getattr(message, "refusal", None):
+                return json.loads(message.content)
+        except json.JSONDecodeError:
+            pass
+
+        metrics.inc("arcos_route_parse_failures_total", stage=stage)
+        if response.usage:
+            metrics.inc("arcos_openai_wasted_tokens_total", response.usage.total_tokens or 0, stage=stage)
+        return None
+
+    @staticmethod
+    def _clean(analysis):
+        """Drop the nulls strict mode forces into data"""
+        analysis["data"] = {k: v for k, v in (analysis.get("data") or {}).items() if v is not None}
+        return analysis
+
+    def _from_similar(self, analysis, command):
+        """A reworded command keeps the cached route but its own title and data"""
+        return self.classifier.build_analysis(analysis.get('pillar', 'tasks'), command) | {
+            "action": analysis.get('action'),
+            "automation": analysis.get('automation', False)
+        }
 
+    @metrics.timed("analyze")
     def analyze_command(self, command):
         """Analyze user command and return routing decision"""
+        started = time.perf_counter()
+
+        cached = self.cache.get_exact(command)
+        if cached:
+            self.tier_stats.record("cache_exact", started)
+            return cached
+
+        analysis, confidence = self.classifier.classify(command)
+        if confidence >= self.fast_path_threshold:
+            self.tier_stats.record("local", started)
+            return analysis
+
+        vector = self.cache.vector_for(command)
+        similar = self.cache.get_similar(vector)
+        if similar:
+            self.tier_stats.record("cache_semantic", started)
+            return self._from_similar(similar, command)
+
+        analysis = self._llm_analyze(command, vector)
+        self.tier_stats.record("llm", started)
+        return analysis
+
+    @metrics.timed("analyze")
+    async def aanalyze_command(self, command):
+        """Async version of analyze_command for the job pipeline"""
+        started = time.perf_counter()
+
+        cached = self.cache.get_exact(command)
+        if cached:
+            self.tier_stats.record("cache_exact", started)
+            return cached
+
+        analysis, confidence = self.classifier.classify(command)
+        if confidence >= self.fast_path_threshold:
+            self.tier_stats.record("local", started)
+            return analysis
+
+        vector = None
+        if self.cache.semantic_enabled:
+            vector = await asyncio.to_thread(self.cache.vector_for, command)
+        similar = self.cache.get_similar(vector)
+        if similar:
+            self.tier_stats.record("cache_semantic", started)
+            return self._from_similar(similar, command)
+
+        analysis = await self._allm_analyze(command, vector)
+        self.tier_stats.record("llm", started)
+        return analysis
+
+    def _llm_analyze(self, command, vector=None):
+        """Ask the LLM for a routing decision and cache a good answer"""
         try:
-            response = openai.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": f"Analyze this command: {command}"}
-                ],
-                max_tokens=300,
-                temperature=0.3
-            )
+            with metrics.span("openai_route"):
+                response = openai_client.chat.completions.create(
+                    model=ROUTER_MODEL,
+                    messages=self._messages(command),
+                    response_format=ROUTING_FORMAT,
+                    max_tokens=ROUTE_MAX_TOKENS,
+                    temperature=0
+                )
+
+            analysis = self._parse_analysis(response, "route")
+            if analysis is not None:
+                analysis = self._clean(analysis)
+                self.cache.put(command, analysis, vector)
+                return analysis
 
-            result = response.choices[0].message.content.strip()
+        except Exception as e:
+            print(f"QB analysis error: {e}")
 
-            # Try to parse JSON response
-            try:
-                if '{' in result:
-                    json_start = result.find('{')
-                    json_end = result.rfind('}') + 1
-                    json_str = result[json_start:json_end]
-                    return json.loads(json_str)
-                else:
-                    return self._fallback_analysis(command)
-            except json.JSONDecodeError:
-                return self._fallback_analysis(command)
+        return self._fallback_analysis(command)
+
+    async def _allm_analyze(self, command, vector=None):
+        """Async version of _llm_analyze"""
+        try:
+            with metrics.span("openai_route"):
+                response = await async_openai_client.chat.completions.create(
+                    model=ROUTER_MODEL,
+                    messages=self._messages(command),
+                    response_format=ROUTING_FORMAT,
+                    max_tokens=ROUTE_MAX_TOKENS,
+                    temperature=0
+                )
+
+            analysis = self._parse_analysis(response, "route")
+            if analysis is not None:
+                analysis = self._clean(analysis)
+                self.cache.put(command, analysis, vector)
+                return analysis
 
         except Exception as e:
             print(f"QB analysis error: {e}")
-            return self._fallback_analysis(command)
+
+        return self._fallback_analysis(command)
+
+    def analyze_batch(self, commands, llm_batch_size=20):
+        """Route many commands; only low-confidence ones go to the LLM, several per call"""
+        results = [None] * len(commands)
+        pending = []
+
+        for i, command in enumerate(commands):
+            started = time.perf_counter()
+            cached = self.cache.get_exact(command)
+            if cached:
+                self.tier_stats.record("cache_exact", started)
+                results[i] = cached
+                continue
+
+            analysis, confidence = self.classifier.classify(command)
+            if confidence >= self.fast_path_threshold:
+                self.tier_stats.record("local", started)
+                results[i] = analysis
+                continue
+
+            self.cache.record_miss()
+            pending.append(i)
+
+        for start in range(0, len(pending), llm_batch_size):
+            group = pending[start:start + llm_batch_size]
+            started = time.perf_counter()
+            analyses = self._llm_analyze_batch([commands[i] for i in group])
+            for i, analysis in zip(group, analyses):
+                results[i] = analysis
+                self.tier_stats.record("llm_batch", started)
+
+        return results
+
+    def _llm_analyze_batch(self, commands):
+        """One LLM call routing a numbered list of commands"""
+        numbered = "\n".join(f"{n}. {command}" for n, command in enumerate(commands, 1))
+        try:
+            with metrics.span("openai_route_batch"):
+                response = openai_client.chat.completions.create(
+                    model=ROUTER_MODEL,
+                    messages=[
+                        {"role": "system", "content": self.system_prompt},
+                        {"role": "user", "content": f"Route each command, in order:\n{numbered}"}
+                    ],
+                    response_format=ROUTING_BATCH_FORMAT,
+                    max_tokens=ROUTE_MAX_TOKENS * len(commands),
+                    temperature=0
+                )
+
+            parsed = self._parse_analysis(response, "route_batch")
+            items = parsed.get("results") if parsed else None
+            if isinstance(items, list) and len(items) == len(commands):
+                analyses = []
+                for command, analysis in zip(commands, items):
+                    analysis = self._clean(analysis)
+                    self.cache.put(command, analysis)
+                    analyses.append(analysis)
+                return analyses
+
+            if items is not None:
+                print(f"QB batch analysis: expected {len(commands)} results")
+
+        except Exception as e:
+            print(f"QB batch analysis error: {e}")
+
+        return [self._fallback_analysis(command) for command in commands]
 
     def _fallback_analysis(self, command):
         """Simple keyword-based fallback if GPT fails"""
-        command_lower = command.lower()
-
-        if any(word in command_lower for word in ['write', 'article', 'content', 'blog', 'post']):
-            return {
-                "pillar": "content",
-                "action": "generate_content",
-                "title": f"Content: {command}",
-                "data": {"topic": command, "word_count": 500},
-                "automation": True
-            }
-        elif any(word in command_lower for word in ['workout', 'exercise', 'run', 'walk', 'health']):
-            return {
-                "pillar": "health",
-                "action": "log_activity",
-                "title": f"Health: {command}",
-                "data": {"activity": command, "duration": 30},
-                "automation": False
-            }
-        elif any(word in command_lower for word in ['expense', 'spend', 'buy', 'cost', 'budget']):
-            return {
-                "pillar": "finance",
-                "action": "track_expense",
-                "title": f"Finance: {command}",
-                "data": {"description": command},
-                "automation": False
-            }
-        elif any(word in command_lower for word in ['learn', 'study', 'course', 'skill', 'training']):
-            return {
-                "pillar": "training",
-                "action": "schedule_learning",
-                "title": f"Training: {command}",
-                "data": {"skill": command},
-                "automation": False
-            }
-        else:
-            return {
-                "pillar": "tasks",
-                "action": "create_task",
-                "title": command,
-                "data": {"description": command},
-                "automation": False
-            }
+        analysis, _ = self.classifier.classify(command)
+        return analysis
 
 
-# Initialize QB
-quarterback = ArcOSQuarterback()
+def embed_command(command):
+    """Embedding for the semantic routing cache"""
+    response = openai_client.embeddings.create(model="text-embedding-3-small", input=command)
+    return response.data[0].embedding
 
 
+# Initialize QB
+routing_cache = RoutingCache(
+    path=os.getenv("ARCOS_ROUTING_CACHE_PATH", "routing_cache.json"),
+    max_entries=int(os.getenv("ARCOS_ROUTING_CACHE_SIZE", 5000)),
+    embed=embed_command if os.getenv("ARCOS_SEMANTIC_CACHE") == "1" else None,
+    similarity_threshold=float(os.getenv("ARCOS_SEMANTIC_THRESHOLD", 0.92))
+)
+quarterback = ArcOSQuarterback(
+    fast_path_threshold=float(os.getenv("ARCOS_FAST_PATH_THRESHOLD", 0.75)),
+    cache=routing_cache
+)
+
+
+@metrics.timed("notion")
 def create_notion_task(pillar, title, data, status="New"):
     """Create a task in the appropriate Notion database"""
     try:
@@ -145,59 +421,54 @@ def create_notion_task(pillar, title, data, status="New"):
         if not db_id:
             return {"error": f"Database not configured for {pillar}"}
 
-        # Base properties all databases should have
-        properties = {
-            "Title": {"title": [{"text": {"content": title}}]},
-            "Created": {"date": {"start": datetime.now().isoformat()}},
-        }
+        response = notion_writer.create_page(
+            parent={"database_id": db_id},
+            properties=payloads.build(pillar, title, data)
+        )
+        notion_mirror.record(response)
+
+        return {"success": True, "page_id": response["id"], "url": response["url"]}
+
+    except Exception as e:
+        print(f"Notion error: {e}")
+        if is_schema_error(e):
+            schema_cache.invalidate(DATABASES.get(pillar))
+        return {"error": str(e)}
 
-        # Add pillar-specific properties
-        if pillar == 'content':
-            properties.update({
-                "Status": {"select": {"name": "Idea"}},
-                "Content Type": {"select": {"name": "Article"}},
-                "Topic": {"rich_text": [{"text": {"content": data.get('topic', '')}}]},
-                "Word Count": {"number": data.get('word_count', 0)}
-            })
-        elif pillar == 'health':
-            properties.update({
-                "Activity Type": {"select": {"name": "Workout"}},
-                "Duration": {"number": data.get('duration', 30)},
-                "Date": {"date": {"start": datetime.now().isoformat()}}
-            })
-        elif pillar == 'finance':
-            properties.update({
-                "Category": {"select": {"name": "Expense"}},
-                "Amount": {"number": data.get('amount', 0)},
-                "Date": {"date": {"start": datetime.now().isoformat()}}
-            })
-        elif pillar == 'training':
-            properties.update({
-                "Skill Area": {"select": {"name": "Technical"}},
-                "Status": {"select": {"name": "Not Started"}},
-                "Progress": {"number": 0}
-            })
-        elif pillar == 'tasks':
-            properties.update({
-                "Status": {"select": {"name": "New"}},
-                "Priority": {"select": {"name": "Medium"}},
-                "Pillar": {"select": {"name": "Operations"}}
-            })
 
-        response = notion.pages.create(
+@metrics.timed("notion")
+async def acreate_notion_task(pillar, title, data):
+    """Async version of create_notion_task"""
+    try:
+        db_id = DATABASES.get(pillar)
+        if not db_id:
+            return {"error": f"Database not configured for {pillar}"}
+
+        # A schema miss means a blocking databases.retrieve, so build off the loop
+        if schema_cache.cached(db_id) is None:
+            properties = await asyncio.to_thread(payloads.build, pillar, title, data)
+        else:
+            properties = payloads.build(pillar, title, data)
+
+        response = await asyncio.wrap_future(notion_writer.submit(
+            notion.pages.create,
             parent={"database_id": db_id},
             properties=properties
-        )
+        ))
+        notion_mirror.record(response)
 
         return {"success": True, "page_id": response["id"], "url": response["url"]}
 
     except Exception as e:
         print(f"Notion error: {e}")
+        if is_schema_error(e):
+            schema_cache.invalidate(DATABASES.get(pillar))
         return {"error": str(e)}
 
 
+@metrics.timed("automation")
 def trigger_make_automation(pillar, action, data):
-    """Trigger Make.com automation"""
+    """Queue a Make.com automation for background delivery"""
     try:
         webhook_url = os.getenv("MAKE_WEBHOOK_URL")
         if not webhook_url:
@@ -211,17 +482,83 @@ def trigger_make_automation(pillar, action, data):
             "timestamp": datetime.now().isoformat()
         }
 
-        response = requests.post(webhook_url, json=payload, timeout=10)
-
-        if response.status_code == 200:
-            return {"success": True, "message": "Automation triggered"}
-        else:
-            return {"error": f"Webhook failed: {response.status_code}"}
+        delivery_id = webhook_dispatcher.dispatch(webhook_url, payload)
+        return {"success": True, "message": "Automation queued", "delivery_id": delivery_id}
 
     except Exception as e:
         return {"error": f"Automation error: {str(e)}"}
 
 
+async def atrigger_make_automation(pillar, action, data):
+    """Async version of trigger_make_automation (queuing never blocks)"""
+    return trigger_make_automation(pillar, action, data)
+
+
+# Durable queue + worker pool for /command/queue
+QUEUE_DB = os.getenv("ARCOS_QUEUE_DB", "arcos_queue.db")
+job_queue = JobQueue(QUEUE_DB, max_depth=int(os.getenv("ARCOS_QUEUE_MAX_DEPTH", 1000)))
+
+# Results of recent /command calls, replayed to retries
+idempotency = IdempotencyStore(
+    os.getenv("ARCOS_IDEMPOTENCY_DB", "arcos_idempotency.db"),
+    key_ttl=int(os.getenv("ARCOS_IDEMPOTENCY_TTL", 86400)),
+    hash_ttl=int(os.getenv("ARCOS_DEDUPE_WINDOW", 600))
+)
+
+
+# Async command pipeline - holds many commands in flight on one event loop
+pipeline = AsyncCommandPipeline(
+    analyze=quarterback.aanalyze_command,
+    create_task=acreate_notion_task,
+    trigger_automation=atrigger_make_automation,
+    max_in_flight=int(os.getenv("ARCOS_MAX_IN_FLIGHT", 500)),
+    db_path=os.getenv("ARCOS_PIPELINE_DB", "arcos_pipeline.db")
+)
+
+
+def execute_command(command):
+    """Run a command through QB -> Notion -> Make.com and return the result"""
+    print(f"🧠 Processing: {command}")
+
+    # QB analyzes the command
+    analysis = quarterback.analyze_command(command)
+    print(f"📊 QB Analysis: {analysis}")
+
+    return execute_analysis(command, analysis)
+
+
+def execute_analysis(command, analysis):
+    """Create the Notion task and trigger automation for a routed command"""
+    pillar = analysis.get('pillar', 'tasks')
+    title = analysis.get('title', command)
+    task_data = analysis.get('data', {})
+
+    # Create task in Notion
+    notion_result = create_notion_task(pillar, title, task_data)
+
+    # Trigger automation if needed
+    automation_result = None
+    if analysis.get('automation', False):
+        automation_result = trigger_make_automation(
+            pillar,
+            analysis.get('action'),
+            {**task_data, 'page_id': notion_result.get('page_id')}
+        )
+
+    return {
+        "success": True,
+        "command": command,
+        "quarterback_analysis": analysis,
+        "notion_result": notion_result,
+        "automation_result": automation_result
+    }
+
+
+def execute_job(payload):
+    """Queue worker entry point"""
+    return execute_command(payload["command"])
+
+
 @app.route('/command', methods=['POST'])
 def process_command():
     """Main command endpoint - the heart of ArcOS"""
@@ -232,42 +569,160 @@ def process_command():
         if not command:
             return jsonify({"error": "Command required"}), 400
 
-        print(f"🧠 Processing: {command}")
+        # A retry (same Idempotency-Key, or the same command within the
+        # dedupe window) gets the original result without re-running anything
+        key, kind = request_key(request.headers.get('Idempotency-Key') or data.get('idempotency_key'), command)
+        result, replayed = idempotency.run(key, kind, lambda: execute_command(command),
+                                           cacheable=lambda r: not r["notion_result"].get("error"))
+        return jsonify(result), 200, {"Idempotent-Replayed": "true" if replayed else "false"}
 
-        # QB analyzes the command
-        analysis = quarterback.analyze_command(command)
-        print(f"📊 QB Analysis: {analysis}")
+    except TimeoutError as e:
+        return jsonify({"error": str(e)}), 409, {"Retry-After": "5"}
 
-        # Execute the action
-        pillar = analysis.get('pillar', 'tasks')
-        title = analysis.get('title', command)
-        task_data = analysis.get('data', {})
+    except Exception as e:
+        print(f"Command error: {e}")
+        return jsonify({"error": str(e)}), 500
 
-        # Create task in Notion
-        notion_result = create_notion_task(pillar, title, task_data)
 
-        # Trigger automation if needed
-        automation_result = None
-        if analysis.get('automation', False):
-            automation_result = trigger_make_automation(
-                pillar,
-                analysis.get('action'),
-                {**task_data, 'page_id': notion_result.get('page_id')}
-            )
+@app.route('/commands/batch', methods=['POST'])
+def process_command_batch():
+    """Stream a CSV/JSONL body of commands through routing and back out as NDJSON.
+
+    CSV bodies are read as having a header row unless sent as
+    "text/csv; header=absent" (RFC 4180).
+    """
+    fmt = "csv" if (request.mimetype or "").endswith("csv") else "jsonl"
+    header = request.mimetype_params.get("header", "present") != "absent"
+    batch_size = int(os.getenv("ARCOS_BATCH_SIZE", 20))
+    max_pending = int(os.getenv("ARCOS_BATCH_MAX_PENDING", 200))
+
+    def run_item(index, command, analysis):
+        try:
+            result = execute_analysis(command, analysis)
+            return {"index": index, **result}
+        except Exception as e:
+            return {"index": index, "command": command, "error": str(e)}
+
+    def generate():
+        lines = io.TextIOWrapper(request.stream, encoding="utf-8")
+        commands = iter_commands(lines, fmt, header)
+        pending = deque()
+        index = 0
+
+        with ThreadPoolExecutor(max_workers=batch_size) as executor:
+            while True:
+                chunk = list(islice(commands, batch_size))
+                if not chunk:
+                    break
+
+                # Classify the chunk together, then fan the writes out; the
+                # Notion scheduler keeps them at the rate limit
+                for command, analysis in zip(chunk, quarterback.analyze_batch(chunk)):
+                    pending.append(executor.submit(run_item, index, command, analysis))
+                    index += 1
+
+                # Emit finished items in order; block once too much is in flight
+                while pending and (pending[0].done() or len(pending) > max_pending):
+                    yield json.dumps(pending.popleft().result()) + "\n"
+
+            while pending:
+                yield json.dumps(pending.popleft().result()) + "\n"
+
+        print(f"📦 Batch processed {index} commands")
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@app.route('/command/queue', methods=['POST'])
+def enqueue_command():
+    """Durably queue a command for the worker pool"""
+    try:
+        data = request.json
+        command = data.get('command')
+
+        if not command:
+            return jsonify({"error": "Command required"}), 400
+
+        idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+        job, created = job_queue.enqueue({"command": command}, idempotency_key)
 
         return jsonify({
             "success": True,
-            "command": command,
-            "quarterback_analysis": analysis,
-            "notion_result": notion_result,
-            "automation_result": automation_result
-        })
+            "job_id": job["id"],
+            "status": job["status"],
+            "duplicate": not created,
+            "status_url": f"/queue/{job['id']}"
+        }), 202 if created else 200
+
+    except QueueFull as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": "5"}
 
     except Exception as e:
         print(f"Command error: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/queue/<job_id>', methods=['GET'])
+def queued_job_status(job_id):
+    """Poll the status of a queued command"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+
+@app.route('/command/async', methods=['POST'])
+def process_command_async():
+    """Accept a command and return a job id right away"""
+    try:
+        data = request.json
+        command = data.get('command')
+
+        if not command:
+            return jsonify({"error": "Command required"}), 400
+
+        job_id = pipeline.submit(command)
+        print(f"🧠 Queued: {command} ({job_id})")
+
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}"
+        }), 202
+
+    except Exception as e:
+        print(f"Command error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Poll the status of an async command"""
+    job = pipeline.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+
+SPECIALIST_PROMPTS = {
+    'content': "You are a content creation specialist. Help with writing, editing, SEO, and content strategy.",
+    'health': "You are a health and fitness specialist. Help with workouts, nutrition, and wellness.",
+    'finance': "You are a personal finance specialist. Help with budgeting, investing, and money management.",
+    'training': "You are a learning and development specialist. Help with skill acquisition and training plans.",
+    'tasks': "You are a productivity specialist. Help with task management and workflow optimization."
+}
+
+# Message prefixes built once; each request only appends the question
+SPECIALIST_PREFIXES = {
+    pillar: ({"role": "system", "content": prompt},)
+    for pillar, prompt in SPECIALIST_PROMPTS.items()
+}
+
+
+def _specialist_messages(pillar, question):
+    return [*SPECIALIST_PREFIXES[pillar], {"role": "user", "content": question}]
+
+
 @app.route('/specialist/<pillar>', methods=['POST'])
 def specialist_advice(pillar):
     """Get advice from specialist GPTs"""
@@ -275,41 +730,93 @@ def specialist_advice(pillar):
         data = request.json
         question = data.get('question', '')
 
-        specialist_prompts = {
-            'content': "You are a content creation specialist. Help with writing, editing, SEO, and content strategy.",
-            'health': "You are a health and fitness specialist. Help with workouts, nutrition, and wellness.",
-            'finance': "You are a personal finance specialist. Help with budgeting, investing, and money management.",
-            'training': "You are a learning and development specialist. Help with skill acquisition and training plans.",
-            'tasks': "You are a productivity specialist. Help with task management and workflow optimization."
-        }
-
-        if pillar not in specialist_prompts:
+        if pillar not in SPECIALIST_PREFIXES:
             return jsonify({"error": "Invalid specialist"}), 400
 
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": specialist_prompts[pillar]},
-                {"role": "user", "content": question}
-            ],
-            max_tokens=500
-        )
+        started = time.perf_counter()
+        with metrics.span("specialist"):
+            response = openai_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=_specialist_messages(pillar, question),
+                max_tokens=500
+            )
+        metrics.record_usage("specialist", response.usage)
 
         advice = response.choices[0].message.content
 
         return jsonify({
             "specialist": pillar,
             "question": question,
-            "advice": advice
+            "advice": advice,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1)
         })
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route('/specialist/<pillar>/stream', methods=['POST'])
+def specialist_advice_stream(pillar):
+    """Stream specialist advice as server-sent events while OpenAI generates it"""
+    data = request.json or {}
+    question = data.get('question', '')
+
+    if pillar not in SPECIALIST_PREFIXES:
+        return jsonify({"error": "Invalid specialist"}), 400
+
+    def generate():
+        started = time.perf_counter()
+        first_token_ms = None
+        chars = 0
+        try:
+            stream = openai_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=_specialist_messages(pillar, question),
+                max_tokens=500,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+
+            for chunk in stream:
+                if not chunk.choices:
+                    # The final chunk carries only token usage
+                    metrics.record_usage("specialist_stream", getattr(chunk, "usage", None))
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if first_token_ms is None:
+                    first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+                    metrics.observe("arcos_specialist_ttft_seconds", first_token_ms / 1000, specialist=pillar)
+                chars += len(delta)
+                yield _sse("delta", {"content": delta})
+
+            metrics.observe("arcos_stage_duration_seconds", time.perf_counter() - started, stage="specialist_stream")
+            yield _sse("done", {
+                "specialist": pillar,
+                "ttft_ms": first_token_ms,
+                "total_ms": round((time.perf_counter() - started) * 1000, 1),
+                "chars": chars
+            })
+
+        except Exception as e:
+            metrics.inc("arcos_stage_errors_total", stage="specialist_stream")
+            yield _sse("error", {"error": str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.route('/webhook/make', methods=['POST'])
 def make_webhook():
-    """Handle webhooks from Make.com"""
+    """Handle webhooks from Make.com: acknowledge now, update Notion in the background"""
     try:
         data = request.json
         print(f"📡 Make.com webhook: {data}")
@@ -317,23 +824,54 @@ def make_webhook():
         action = data.get('action')
         page_id = data.get('page_id')
 
-        if action == 'content_generated' and page_id:
-            # Update the Notion page with completion status
-            notion.pages.update(
-                page_id=page_id,
-                properties={
-                    "Status": {"select": {"name": "AI Generated"}}
-                }
-            )
-            print(f"✅ Updated page {page_id} status to AI Generated")
+        properties = WEBHOOK_ACTIONS.get(action)
+        if not properties or not page_id:
+            return jsonify({"success": True, "message": "Webhook ignored"})
 
-        return jsonify({"success": True, "message": "Webhook processed"})
+        result = inbound_webhooks.submit(page_id, action, properties)
+        if result == "rejected":
+            return jsonify({"error": "Webhook queue full, retry later"}), 503, {"Retry-After": "30"}
+
+        return jsonify({"success": True, "message": f"Webhook {result}"}), 202
 
     except Exception as e:
         print(f"Webhook error: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/mirror/pages', methods=['GET'])
+def mirror_pages():
+    """Query mirrored pages by pillar, status and date range, without calling Notion"""
+    try:
+        pages = notion_mirror.query(
+            pillar=request.args.get('pillar'),
+            status=request.args.get('status'),
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            limit=min(int(request.args.get('limit', 100)), 1000)
+        )
+        return jsonify({"success": True, "count": len(pages), "pages": pages})
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/mirror/pages/<page_id>', methods=['GET'])
+def mirror_page(page_id):
+    """One mirrored page"""
+    page = notion_mirror.get(page_id)
+    if page is None:
+        return jsonify({"error": "Page not in mirror"}), 404
+    return jsonify(page)
+
+
+@app.route('/mirror/sync', methods=['POST'])
+def mirror_sync():
+    """Run an incremental sync now (optionally ?pillar=...)"""
+    synced = notion_mirror.sync(pillar=request.args.get('pillar'))
+    return jsonify({"success": True, "synced": synced})
+
+
 @app.route('/status', methods=['GET'])
 def system_status():
     """Check ArcOS system status"""
@@ -345,28 +883,44 @@ def system_status():
             "integrations": {}
         }
 
-        # Check databases
-        for pillar, db_id in DATABASES.items():
-            if db_id:
-                try:
-                    notion.databases.retrieve(db_id)
-                    status["databases"][pillar] = "✅ Connected"
-                except:
-                    status["databases"][pillar] = "❌ Error"
-            else:
-                status["databases"][pillar] = "⚠️ Not Configured"
+        # Check databases (cached, refreshed concurrently in the background)
+        status["databases"], status["databases_checked_seconds_ago"] = db_health.status()
 
         # Check integrations
         status["integrations"]["notion"] = "✅ Connected" if os.getenv("NOTION_API_KEY") else "❌ No API Key"
         status["integrations"]["openai"] = "✅ Connected" if os.getenv("OPENAI_API_KEY") else "❌ No API Key"
         status["integrations"]["make"] = "✅ Configured" if os.getenv("MAKE_WEBHOOK_URL") else "⚠️ No Webhook"
 
+        status["async_pipeline"] = pipeline.stats()
+        status["queue"] = job_queue.metrics()
+        status["idempotency"] = idempotency.stats()
+        status["connection_pools"] = clients.stats()
+        status["schema_cache"] = schema_cache.stats()
+        status["notion_writer"] = notion_writer.stats()
+        status["quarterback_tiers"] = quarterback.tier_stats.stats()
+        status["routing_cache"] = routing_cache.stats()
+        status["webhooks"] = webhook_dispatcher.stats()
+        status["inbound_webhooks"] = inbound_webhooks.stats()
+        status["mirror"] = notion_mirror.stats()
+
         return jsonify(status)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage timings, token counts and retries in Prometheus text format"""
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route('/healthz', methods=['GET'])
+def liveness():
+    """Cheap liveness probe - never touches external services"""
+    return jsonify({"status": "ok"})
+
+
 @app.route('/', methods=['GET'])
 def home():
     """Simple home page"""
@@ -384,7 +938,21 @@ def home():
       -H "Content-Type: application/json" \\
       -d '{"command": "Log 30 minute workout"}'
 
+    curl -X POST http://localhost:5000/command/async \\
+      -H "Content-Type: application/json" \\
+      -d '{"command": "Track $50 grocery expense"}'
+
+    curl http://localhost:5000/jobs/&lt;job_id&gt;
+
+    curl -N -X POST http://localhost:5000/specialist/health/stream \\
+      -H "Content-Type: application/json" \\
+      -d '{"question": "Plan a 20 minute workout"}'
+
+    python batch_import.py backlog.csv
+
     curl http://localhost:5000/status
+    curl http://localhost:5000/healthz
+    curl http://localhost:5000/metrics
     </pre>
 
     <h3>📊 System Status:</h3>
@@ -401,7 +969,20 @@ if __name__ == '__main__':
     print(f"📡 Webhook: {'Configured' if os.getenv('MAKE_WEBHOOK_URL') else 'Not configured'}")
     print("=" * 50)
 
-    app.run(host='0.0.0.0', port=port, debug=True)
+    # Development server only; use serve.py in production
+    debug = os.getenv("ARCOS_DEBUG", "1") == "1"
+
+    # The debug reloader runs this block twice; only the serving child starts workers.
+    # The pool forks, so it starts before any background thread or connection exists.
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        WorkerPool(QUEUE_DB, execute_job, workers=int(os.getenv("ARCOS_WORKERS", 2))).start()
+
+        schema_cache.warm(DATABASES)
+        payloads.warm()
+        notion_mirror.start()
+        inbound_webhooks.start()
+
+    app.run(host='0.0.0.0', port=port, debug=debug)
 
 
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+ArcOS Metrics
+Low-overhead counters and log-bucketed latency histograms, rendered in the
+Prometheus text format for /metrics. Under several worker processes each one
+writes its snapshot to a shared directory and /metrics adds them all up.
+"""
+
+import bisect
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Two buckets per doubling from 1ms to ~65s: constant ~41% relative precision,
+# the same trade-off an HDR histogram makes, in 33 buckets
+BUCKETS = [0.001 * 2 ** (i / 2) for i in range(33)]
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Thread-safe store of labelled counters and histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}    # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._help = {}
+        self.multiprocess_dir = None
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, stage):
+        """Time a block as one stage; exceptions count as errors"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc("arcos_stage_errors_total", stage=stage)
+            raise
+        finally:
+            self.observe("arcos_stage_duration_seconds", time.perf_counter() - started, stage=stage)
+
+    def timed(self, stage):
+        """Decorator form of span for sync and async functions.
+
+        A returned dict with an "error" key also counts as an error, since
+        ArcOS functions report failures that way instead of raising.
+        """
+        def decorate(fn):
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(stage):
+                        result = await fn(*args, **kwargs)
+                    self._count_error_result(stage, result)
+                    return result
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    result = fn(*args, **kwargs)
+                self._count_error_result(stage, result)
+                return result
+            return wrapper
+        return decorate
+
+    def _count_error_result(self, stage, result):
+        if isinstance(result, dict) and result.get("error"):
+            self.inc("arcos_stage_errors_total", stage=stage)
+
+    def record_usage(self, stage, usage):
+        """Count OpenAI prompt/completion tokens from a response's usage block"""
+        if usage is None:
+            return
+        self.inc("arcos_openai_tokens_total", usage.prompt_tokens or 0, stage=stage, kind="prompt")
+        self.inc("arcos_openai_tokens_total", usage.completion_tokens or 0, stage=stage, kind="completion")
+
+    def snapshot(self):
+        """This process's series as JSON-friendly lists"""
+        with self._lock:
+            return {
+                "counters": [[name, labels, value] for (name, labels), value in self._counters.items()],
+                "histograms": [[name, labels, list(h.counts), h.sum, h.count]
+                               for (name, labels), h in self._histograms.items()]
+            }
+
+    def enable_multiprocess(self, directory, interval=5.0):
+        """Share this process's series with the other workers through directory.
+
+        Forked children start from empty series and publish under their own pid.
+        """
+        if self.multiprocess_dir:
+            return
+        self.multiprocess_dir = directory
+        os.makedirs(directory, exist_ok=True)
+
+        def publish():
+            while True:
+                time.sleep(interval)
+                self.write_snapshot()
+
+        def start():
+            threading.Thread(target=publish, name="metrics-publish", daemon=True).start()
+
+        def reset_in_child():
+            self._lock = threading.Lock()
+            self._counters, self._histograms = {}, {}
+            start()
+
+        os.register_at_fork(after_in_child=reset_in_child)
+        start()
+
+    def write_snapshot(self):
+        if not self.multiprocess_dir:
+            return
+        path = os.path.join(self.multiprocess_dir, f"{os.getpid()}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(path + ".tmp", path)
+
+    def _collect(self):
+        """(counters, histograms) for this process, or summed over every worker's snapshot"""
+        if not self.multiprocess_dir:
+            with self._lock:
+                return (dict(self._counters),
+                        {key: (list(h.counts), h.sum, h.count) for key, h in self._histograms.items()})
+
+        # Files of exited workers are kept, so counters never go backwards
+        self.write_snapshot()
+        counters, histograms = {}, {}
+        for filename in os.listdir(self.multiprocess_dir):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, filename)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, counts, total, count in snapshot["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.get(key, ([0] * len(counts), 0.0, 0))
+                histograms[key] = ([a + b for a, b in zip(merged[0], counts)], merged[1] + total, merged[2] + count)
+        return counters, histograms
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        counters, histograms = self._collect()
+        counters = sorted(counters.items())
+        histograms = sorted(((key, *values) for key, values in histograms.items()), key=lambda item: item[0])
+
+        lines = []
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), counts, total, count in histograms:
+            if name not in seen:
+                seen.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+            running = 0
+            for bound, bucket_count in zip(BUCKETS + [float("inf")], counts):
+                running += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:.6g}"
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {running}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+# Process-wide registry shared by every ArcOS module
+registry = Registry()
+registry.describe("arcos_stage_duration_seconds", "Time spent in each request stage")
+registry.describe("arcos_stage_errors_total", "Stage calls that raised or returned an error")
+registry.describe("arcos_openai_tokens_total", "OpenAI tokens used, by stage and prompt/completion")
+registry.describe("arcos_retries_total", "Retried outbound calls, by service")
+registry.describe("arcos_notion_queue_seconds", "Time Notion writes waited for the rate limiter")
+registry.describe("arcos_notion_api_seconds", "Time Notion write calls spent in the API")
+registry.describe("arcos_specialist_ttft_seconds", "Time to first streamed specialist token")
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+ArcOS Notion Mirror
+Local SQLite copy of the pillar databases. Pages ArcOS creates or updates
+are written through as the API returns them, and a periodic incremental sync
+(last_edited_time filter) picks up edits made in Notion itself. Reads of
+task state then come from the mirror instead of the Notion API.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Date property used for range queries, first one present wins
+DATE_PROPERTIES = ["Date", "Start Date", "Created"]
+
+
+def _plain_text(rich_text):
+    return "".join(part.get("plain_text") or part.get("text", {}).get("content", "") for part in rich_text)
+
+
+def flatten_page(page):
+    """(title, status, date) from a Notion page; None where the page doesn't say"""
+    properties = page.get("properties", {})
+    title = next((_plain_text(p["title"]) for p in properties.values() if "title" in p), None)
+
+    status = properties.get("Status", {}).get("select")
+    status = status.get("name") if status else None
+
+    date = None
+    for name in DATE_PROPERTIES:
+        value = properties.get(name, {}).get("date")
+        if value and value.get("start"):
+            date = value["start"]
+            break
+    return title, status, date
+
+
+class NotionMirror:
+    """Write-through SQLite mirror of the ArcOS databases with incremental sync"""
+
+    def __init__(self, notion, databases, db_path="arcos_mirror.db", sync_interval=60, scheduler=None):
+        self.notion = notion
+        self.databases = databases
+        self.pillars = {db_id: pillar for pillar, db_id in databases.items() if db_id}
+        self.db_path = db_path
+        self.sync_interval = sync_interval
+        # Sync reads share the write scheduler's rate limit when one is given
+        self._call = scheduler.call if scheduler else (lambda fn, **kwargs: fn(**kwargs))
+        self._local = threading.local()
+        self._thread = None
+        self._thread_pid = None
+        self._lock = threading.Lock()
+        self.counters = {"written_through": 0, "synced": 0, "syncs": 0, "sync_errors": 0, "queries": 0}
+        self._init_db()
+
+    def _connect(self):
+        """One connection per thread (and per process after a fork)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                id TEXT PRIMARY KEY,
+                pillar TEXT,
+                database_id TEXT,
+                title TEXT,
+                status TEXT,
+                date TEXT,
+                url TEXT,
+                created_time TEXT,
+                last_edited_time TEXT,
+                archived INTEGER NOT NULL DEFAULT 0,
+                properties TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_status ON pages (pillar, status, date)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_date ON pages (pillar, date)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                database_id TEXT PRIMARY KEY,
+                synced_until TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE TABLE IF NOT EXISTS sync_lease (id INTEGER PRIMARY KEY, lease_until REAL NOT NULL)")
+
+    def _upsert(self, conn, page):
+        database_id = (page.get("parent") or {}).get("database_id")
+        title, status, date = flatten_page(page)
+        # Update responses may be partial, so unknown columns keep their old values
+        conn.execute("""
+            INSERT INTO pages (id, pillar, database_id, title, status, date, url,
+                               created_time, last_edited_time, archived, properties)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                pillar = COALESCE(excluded.pillar, pillar),
+                database_id = COALESCE(excluded.database_id, database_id),
+                title = COALESCE(excluded.title, title),
+                status = COALESCE(excluded.status, status),
+                date = COALESCE(excluded.date, date),
+                url = COALESCE(excluded.url, url),
+                created_time = COALESCE(excluded.created_time, created_time),
+                last_edited_time = COALESCE(excluded.last_edited_time, last_edited_time),
+                archived = excluded.archived,
+                properties = excluded.properties
+        """, (
+            page["id"], self.pillars.get(database_id), database_id, title, status, date, page.get("url"),
+            page.get("created_time"), page.get("last_edited_time"), int(bool(page.get("archived"))),
+            json.dumps(page.get("properties", {}))
+        ))
+
+    def record(self, page):
+        """Write through a page object returned by pages.create / pages.update"""
+        try:
+            self._upsert(self._connect(), page)
+            self._count("written_through")
+        except sqlite3.Error as e:
+            print(f"Mirror write error: {e}")
+
+    def sync(self, pillar=None):
+        """Pull pages edited since the last sync; returns the number mirrored"""
+        total = 0
+        for name, db_id in self.databases.items():
+            if not db_id or (pillar and name != pillar):
+                continue
+            try:
+                total += self._sync_database(db_id)
+            except Exception as e:
+                self._count("sync_errors")
+                print(f"Mirror sync error for {name}: {e}")
+        self._count("syncs")
+        self._count("synced", total)
+        return total
+
+    def _sync_database(self, db_id):
+        conn = self._connect()
+        row = conn.execute("SELECT synced_until FROM sync_state WHERE database_id = ?", (db_id,)).fetchone()
+        # Next sync starts a minute before this one did: last_edited_time is
+        # minute-granular, and re-mirroring a page is harmless
+        started = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+
+        body = {"page_size": 100, "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}]}
+        if row:
+            body["filter"] = {"timestamp": "last_edited_time",
+                              "last_edited_time": {"on_or_after": row["synced_until"]}}
+
+        count = 0
+        while True:
+            # Raw request: newer notion-client releases dropped databases.query
+            response = self._call(self.notion.request, path=f"databases/{db_id}/query", method="POST", body=body)
+            conn.execute("BEGIN")
+            try:
+                for page in response.get("results", []):
+                    page.setdefault("parent", {"database_id": db_id})
+                    self._upsert(conn, page)
+                    count += 1
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            if not response.get("has_more"):
+                break
+            body["start_cursor"] = response["next_cursor"]
+
+        conn.execute(
+            "INSERT INTO sync_state (database_id, synced_until) VALUES (?, ?) "
+            "ON CONFLICT(database_id) DO UPDATE SET synced_until = excluded.synced_until",
+            (db_id, started)
+        )
+        return count
+
+    def _claim_sync(self):
+        """Only one process sharing the mirror file syncs per interval"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT lease_until FROM sync_lease WHERE id = 1").fetchone()
+        if row and row["lease_until"] > now:
+            conn.execute("ROLLBACK")
+            return False
+        conn.execute("INSERT OR REPLACE INTO sync_lease (id, lease_until) VALUES (1, ?)",
+                     (now + self.sync_interval * 0.9,))
+        conn.execute("COMMIT")
+        return True
+
+    def start(self):
+        """Run the periodic sync on a background thread"""
+        if self._thread and self._thread.is_alive() and self._thread_pid == os.getpid():
+            return self
+
+        def run():
+            while True:
+                try:
+                    if self._claim_sync():
+                        self.sync()
+                except sqlite3.Error as e:
+                    print(f"Mirror sync error: {e}")
+                time.sleep(self.sync_interval)
+
+        self._thread = threading.Thread(target=run, name="notion-mirror-sync", daemon=True)
+        self._thread_pid = os.getpid()
+        self._thread.start()
+        return self
+
+    def query(self, pillar=None, status=None, since=None, until=None, limit=100, include_archived=False):
+        """Mirrored pages filtered by pillar, status and date range, newest first"""
+        clauses, params = [], []
+        if pillar:
+            clauses.append("pillar = ?")
+            params.append(pillar)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if since:
+            clauses.append("date >= ?")
+            params.append(since)
+        if until:
+            clauses.append("date <= ?")
+            params.append(until)
+        if not include_archived:
+            clauses.append("archived = 0")
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            f"SELECT id, pillar, title, status, date, url, created_time, last_edited_time "
+            f"FROM pages {where} ORDER BY date DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        self._count("queries")
+        return [dict(row) for row in rows]
+
+    def get(self, page_id):
+        """One mirrored page including its raw properties, or None"""
+        row = self._connect().execute("SELECT * FROM pages WHERE id = ?", (page_id,)).fetchone()
+        if row is None:
+            return None
+        page = dict(row)
+        page["properties"] = json.loads(page["properties"] or "{}")
+        page["archived"] = bool(page["archived"])
+        return page
+
+    def stats(self):
+        conn = self._connect()
+        with self._lock:
+            counters = dict(self.counters)
+        counters["pages"] = conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        counters["synced_until"] = {
+            self.pillars.get(row["database_id"], row["database_id"]): row["synced_until"]
+            for row in conn.execute("SELECT * FROM sync_state")
+        }
+        return counters
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+ArcOS Notion Payloads
+One declarative property list per pillar, compiled once against the cached
+database schema into a template. Building a page payload then only fills
+in the per-request values.
+"""
+
+import re
+import threading
+from datetime import datetime
+
+from notion_schema import SchemaCache
+
+
+class Field:
+    """A value taken from the analysis data dict"""
+
+    def __init__(self, key, default, parse=None):
+        self.key = key
+        self.default = default
+        self.parse = parse
+
+    def value(self, data):
+        value = data.get(self.key, self.default)
+        return self.parse(value, self.default) if self.parse else value
+
+
+TITLE = object()  # the task title
+NOW = object()    # request timestamp, computed once per payload
+
+
+def _to_number(value, default):
+    """Accept 45, "45" or "45 minutes" """
+    if isinstance(value, (int, float)):
+        return value
+    numbers = re.findall(r'\d+(?:\.\d+)?', str(value))
+    if not numbers:
+        return default
+    return float(numbers[0]) if '.' in numbers[0] else int(numbers[0])
+
+
+# pillar -> [(property name, property type, value source)]
+PILLAR_PROPERTIES = {
+    'content': [
+        ("Title", "title", TITLE),
+        ("Created", "date", NOW),
+        ("Status", "select", "Idea"),
+        ("Content Type", "select", "Article"),
+        ("Topic", "rich_text", Field("topic", "")),
+        ("Word Count", "number", Field("word_count", 0, _to_number)),
+    ],
+    'health': [
+        ("Title", "title", TITLE),
+        ("Created", "date", NOW),
+        ("Activity Type", "select", "Workout"),
+        ("Duration", "number", Field("duration", 30, _to_number)),
+        ("Date", "date", NOW),
+    ],
+    'finance': [
+        ("Title", "title", TITLE),
+        ("Created", "date", NOW),
+        ("Category", "select", "Expense"),
+        ("Amount", "number", Field("amount", 0, _to_number)),
+        ("Date", "date", NOW),
+    ],
+    'training': [
+        ("Title", "title", TITLE),
+        ("Created", "date", NOW),
+        ("Skill Area", "select", "Technical"),
+        ("Status", "select", "Not Started"),
+        ("Progress", "number", 0),
+    ],
+    'tasks': [
+        ("Title", "title", TITLE),
+        ("Created", "date", NOW),
+        ("Status", "select", "New"),
+        ("Priority", "select", "Medium"),
+        ("Pillar", "select", "Operations"),
+    ],
+}
+
+
+def _wrap(prop_type, value):
+    """Notion property payload for a raw value"""
+    if prop_type == "title":
+        return {"title": [{"text": {"content": value}}]}
+    if prop_type == "rich_text":
+        return {"rich_text": [{"text": {"content": str(value)}}]}
+    if prop_type == "select":
+        return {"select": {"name": value}}
+    if prop_type == "date":
+        return {"date": {"start": value}}
+    return {prop_type: value}
+
+
+class PayloadTemplate:
+    """Compiled property list for one pillar against one schema"""
+
+    def __init__(self, specs, schema):
+        self.schema = schema
+        self.constant = {}  # name -> prebuilt payload, shared across requests
+        self.dynamic = []   # (name, type, source) filled per request
+
+        title_name = next((name for name, t in (schema or {}).items() if t == "title"), None)
+        for name, prop_type, source in specs:
+            if schema:
+                if prop_type == "title":
+                    if not title_name:
+                        continue
+                    name = title_name
+                elif schema.get(name) != prop_type:
+                    continue
+
+            if source is TITLE or source is NOW or isinstance(source, Field):
+                self.dynamic.append((name, prop_type, source))
+            else:
+                self.constant[name] = _wrap(prop_type, source)
+
+    def build(self, title, data, now):
+        """Fresh properties dict; constant payloads are shared, never mutate them"""
+        properties = dict(self.constant)
+        for name, prop_type, source in self.dynamic:
+            if source is TITLE:
+                properties[name] = {"title": [{"text": {"content": title}}]}
+            elif source is NOW:
+                properties[name] = {"date": {"start": now}}
+            else:
+                properties[name] = _wrap(prop_type, source.value(data))
+        return properties
+
+
+class PayloadRegistry:
+    """Compiled templates per (pillar, field subset), rebuilt when a schema changes"""
+
+    def __init__(self, schema_cache: SchemaCache, databases, specs=PILLAR_PROPERTIES):
+        self.schema_cache = schema_cache
+        self.databases = databases
+        self.specs = specs
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def template(self, pillar, fields=None):
+        """Template for a pillar, optionally limited to the named properties"""
+        db_id = self.databases.get(pillar)
+        schema = (self.schema_cache.get(db_id) if db_id else None) or None  # unknown schema -> unfiltered
+        key = (pillar, fields)
+
+        template = self._templates.get(key)
+        if template is None or template.schema is not schema:
+            specs = self.specs[pillar]
+            if fields:
+                specs = [spec for spec in specs if spec[0] in fields]
+            template = PayloadTemplate(specs, schema)
+            with self._lock:
+                self._templates[key] = template
+        return template
+
+    def build(self, pillar, title, data, fields=None):
+        """Notion properties for a new page in the pillar's database"""
+        if pillar not in self.specs:
+            pillar = 'tasks'
+        return self.template(pillar, fields).build(title, data or {}, datetime.now().isoformat())
+
+    def warm(self, fields=None):
+        """Compile every pillar's template (after the schema cache is warm).
+
+        fields limits the properties, either for all pillars or as {pillar: fields}.
+        """
+        for pillar in self.specs:
+            self.template(pillar, fields.get(pillar) if isinstance(fields, dict) else fields)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+ArcOS Notion Write Scheduler
+Every Notion write goes through one queue drained at Notion's rate limit
+(~3 requests/second per integration), so bursts turn into a steady stream
+instead of a pile of 429s
+"""
+
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+from metrics import registry as metrics
+
+
+class TokenBucket:
+    """Thread-safe token bucket with a pause for Retry-After"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Stop handing out tokens for a while (Notion sent Retry-After)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+    def share(self, shares):
+        """Keep 1/shares of the rate and burst, for one of several processes on the same limit"""
+        with self._lock:
+            self.rate = self.rate / shares
+            self.capacity = max(1, self.capacity // shares)
+            self.tokens = min(self.tokens, self.capacity)
+
+
+class NotionWriteScheduler:
+    """Queue of Notion write calls drained by a few dispatcher threads"""
+
+    def __init__(self, notion, rate=3.0, burst=3, dispatchers=3, max_retries=5, base_backoff=0.5):
+        self.notion = notion
+        self.bucket = TokenBucket(rate, burst)
+        self.dispatchers = dispatchers
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self.counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "queue_seconds": 0.0,
+            "api_seconds": 0.0
+        }
+
+    def _ensure_started(self):
+        """Start dispatcher threads on first use"""
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(len(self._threads), self.dispatchers):
+                thread = threading.Thread(target=self._dispatch, name=f"notion-writer-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule fn(*args, **kwargs) and return a Future"""
+        self._ensure_started()
+        future = Future()
+        with self._lock:
+            self.counters["submitted"] += 1
+        self._queue.put((fn, args, kwargs, future, time.perf_counter()))
+        return future
+
+    def call(self, fn, *args, **kwargs):
+        """Schedule fn and wait for its result"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def create_page(self, **kwargs):
+        return self.call(self.notion.pages.create, **kwargs)
+
+    def update_page(self, **kwargs):
+        return self.call(self.notion.pages.update, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        finished = counters["completed"] + counters["failed"]
+        counters["queue_depth"] = self._queue.qsize()
+        counters["avg_queue_ms"] = round(counters["queue_seconds"] / finished * 1000, 1) if finished else None
+        counters["avg_api_ms"] = round(counters["api_seconds"] / finished * 1000, 1) if finished else None
+        return counters
+
+    def shutdown(self, timeout=30):
+        """Wait for queued writes to drain"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.1)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _dispatch(self):
+        while True:
+            fn, args, kwargs, future, queued_at = self._queue.get()
+            try:
+                if future.set_running_or_notify_cancel():
+                    self._execute(fn, args, kwargs, future, queued_at)
+            finally:
+                self._queue.task_done()
+
+    def _execute(self, fn, args, kwargs, future, queued_at):
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            started = time.perf_counter()
+            if attempt == 0:
+                # Queue time includes waiting for a rate-limit token
+                self._count("queue_seconds", started - queued_at)
+                metrics.observe("arcos_notion_queue_seconds", started - queued_at)
+            try:
+                result = fn(*args, **kwargs)
+                self._count("api_seconds", time.perf_counter() - started)
+                metrics.observe("arcos_notion_api_seconds", time.perf_counter() - started)
+                self._count("completed")
+                future.set_result(result)
+                return
+
+            except Exception as e:
+                self._count("api_seconds", time.perf_counter() - started)
+                delay = self._retry_delay(e, attempt)
+                if delay is None or attempt >= self.max_retries:
+                    self._count("failed")
+                    future.set_exception(e)
+                    return
+
+                attempt += 1
+                self._count("retries")
+                metrics.inc("arcos_retries_total", service="notion")
+                print(f"⏳ Notion retry {attempt}/{self.max_retries} in {delay:.1f}s: {e}")
+                time.sleep(delay)
+
+    def _retry_delay(self, error, attempt):
+        """Seconds to wait before retrying, or None if the error is not retryable"""
+        if isinstance(error, HTTPResponseError) and error.status == 429:
+            self._count("rate_limited")
+            try:
+                retry_after = float(error.headers.get("Retry-After", 1))
+            except ValueError:
+                retry_after = 1.0
+            self.bucket.pause(retry_after)
+            return retry_after + random.uniform(0, self.base_backoff)
+
+        if isinstance(error, RequestTimeoutError) or (
+                isinstance(error, HTTPResponseError) and error.status >= 500):
+            # Exponential backoff with full jitter
+            return random.uniform(0, self.base_backoff * (2 ** attempt))
+
+        return None
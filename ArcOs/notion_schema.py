@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+ArcOS Notion Schema Cache
+Keeps each database's property schema in memory so payload templates can be
+validated without a databases.retrieve call per page create
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from notion_client import APIErrorCode, APIResponseError
+
+
+class SchemaCache:
+    """Database id -> {property name: property type}, with a TTL"""
+
+    def __init__(self, notion, ttl=300):
+        self.notion = notion
+        self.ttl = ttl
+        self._schemas = {}  # db_id -> (fetched_at, {name: type})
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, db_id):
+        """Return the cached schema if it is still fresh, without touching Notion"""
+        with self._lock:
+            entry = self._schemas.get(db_id)
+            if entry and time.time() - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+        return None
+
+    def get(self, db_id):
+        """Return the schema for a database, fetching it on a miss"""
+        schema = self.cached(db_id)
+        if schema is not None:
+            return schema
+
+        self.misses += 1
+        try:
+            db = self.notion.databases.retrieve(db_id)
+        except Exception as e:
+            print(f"Error getting database properties: {e}")
+            return {}
+
+        schema = {name: info['type'] for name, info in db['properties'].items()}
+        with self._lock:
+            self._schemas[db_id] = (time.time(), schema)
+        return schema
+
+    def warm(self, databases):
+        """Fetch the schemas for a {pillar: db_id} mapping concurrently"""
+        db_ids = [db_id for db_id in databases.values() if db_id]
+        if not db_ids:
+            return
+        with ThreadPoolExecutor(max_workers=len(db_ids)) as executor:
+            list(executor.map(self.get, db_ids))
+        print(f"📐 Cached {len(self._schemas)}/{len(db_ids)} database schemas")
+
+    def invalidate(self, db_id=None):
+        """Drop one database's schema, or all of them"""
+        with self._lock:
+            if db_id is None:
+                self._schemas.clear()
+            else:
+                self._schemas.pop(db_id, None)
+
+    def stats(self):
+        return {"databases": len(self._schemas), "hits": self.hits, "misses": self.misses, "ttl": self.ttl}
+
+
+def is_schema_error(error):
+    """True when Notion rejected a page because of a property mismatch"""
+    return (
+        isinstance(error, APIResponseError)
+        and error.code == APIErrorCode.ValidationError
+        and 'propert' in str(error).lower()
+    )
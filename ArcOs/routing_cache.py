@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+ArcOS Routing Cache
+Remembers quarterback routing decisions so repeat commands skip OpenAI.
+Exact matches use normalised text; an optional embedding layer catches
+rewordings above a similarity threshold.
+"""
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+SYNONYMS = {
+    'min': 'minute', 'mins': 'minute', 'minutes': 'minute',
+    'hr': 'hour', 'hrs': 'hour', 'hours': 'hour',
+    'km': 'kilometer', 'kms': 'kilometer',
+    'w/': 'with',
+}
+TOKEN_RE = re.compile(r"[a-z0-9$.]+|w/")
+
+
+def normalize_command(command):
+    """Lowercase, drop punctuation and collapse common abbreviations"""
+    tokens = TOKEN_RE.findall(command.lower())
+    return ' '.join(SYNONYMS.get(token.strip('.'), token.strip('.')) for token in tokens)
+
+
+class RoutingCache:
+    """LRU + TTL cache of routing decisions, persisted to a JSON file"""
+
+    def __init__(self, path=None, max_entries=5000, ttl=7 * 24 * 3600,
+                 embed=None, similarity_threshold=0.92, save_every=20):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embed = embed  # optional callable: text -> list of floats
+        self.similarity_threshold = similarity_threshold
+        self.save_every = save_every
+
+        self._entries = OrderedDict()  # normalised -> {"analysis", "stored_at", "vector"}
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._matrix_keys = []
+        self._unsaved = 0
+        self.counters = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0}
+
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    @property
+    def semantic_enabled(self):
+        return self.embed is not None
+
+    def get_exact(self, command):
+        """Exact lookup on normalised text - no network"""
+        key = normalize_command(command)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry["stored_at"] < self.ttl:
+                self._entries.move_to_end(key)
+                self.counters["exact_hits"] += 1
+                return dict(entry["analysis"])
+            if entry:
+                self._remove(key)
+        return None
+
+    def vector_for(self, command):
+        """Embedding for a command, or None if the layer is off or the call fails"""
+        if not self.semantic_enabled:
+            return None
+        try:
+            return self.embed(command)
+        except Exception as e:
+            print(f"Routing cache embedding error: {e}")
+            return None
+
+    def get_similar(self, vector):
+        """Nearest cached command by cosine similarity, if above the threshold"""
+        if vector is None:
+            self.record_miss()
+            return None
+
+        query = _unit(vector)
+
+        with self._lock:
+            if self._matrix is None:
+                self._build_matrix()
+            if self._matrix is None:
+                self.counters["misses"] += 1
+                return None
+
+            similarities = self._matrix @ query
+            best = int(np.argmax(similarities))
+            key = self._matrix_keys[best]
+            entry = self._entries.get(key)
+            if (similarities[best] >= self.similarity_threshold and entry
+                    and time.time() - entry["stored_at"] < self.ttl):
+                self._entries.move_to_end(key)
+                self.counters["semantic_hits"] += 1
+                return dict(entry["analysis"])
+
+            self.counters["misses"] += 1
+            return None
+
+    def record_miss(self):
+        """Count a miss for a lookup that skipped the semantic layer"""
+        with self._lock:
+            self.counters["misses"] += 1
+
+    def put(self, command, analysis, vector=None):
+        key = normalize_command(command)
+        with self._lock:
+            self._entries[key] = {
+                "analysis": analysis,
+                "stored_at": time.time(),
+                "vector": _unit(vector).tolist() if vector is not None else None
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.counters["evictions"] += 1
+            self._matrix = None
+            self._unsaved += 1
+            should_save = self.path and self._unsaved >= self.save_every
+
+        if should_save:
+            self.save()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            size = len(self._entries)
+        lookups = counters["exact_hits"] + counters["semantic_hits"] + counters["misses"]
+        hits = counters["exact_hits"] + counters["semantic_hits"]
+        counters["entries"] = size
+        counters["hit_rate"] = round(hits / lookups, 3) if lookups else None
+        counters["semantic"] = self.semantic_enabled
+        return counters
+
+    def save(self):
+        """Write the cache to disk atomically"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {key: entry for key, entry in self._entries.items()}
+            self._unsaved = 0
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"  # several processes may share one cache file
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Routing cache save error: {e}")
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Routing cache load error: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            for key, entry in sorted(data.items(), key=lambda item: item[1]["stored_at"]):
+                if now - entry["stored_at"] < self.ttl:
+                    self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+        print(f"🗂️  Loaded {len(self._entries)} cached routing decisions")
+
+    def _remove(self, key):
+        del self._entries[key]
+        self._matrix = None
+
+    def _build_matrix(self):
+        """Stack entry vectors into one matrix for a single matmul per lookup"""
+        keys = [key for key, entry in self._entries.items() if entry["vector"] is not None]
+        if not keys:
+            self._matrix, self._matrix_keys = None, []
+            return
+        self._matrix = np.array([self._entries[key]["vector"] for key in keys], dtype=np.float32)
+        self._matrix_keys = keys
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+ArcOS Production Server
+Runs main.py or simplearcos.py under gunicorn instead of Flask's development
+server: pre-forked workers sized to the cores, the app (prompt, classifier
+and the openai/notion_client packages) imported once in the master, API
+clients built per worker, graceful drain on shutdown, e.g.
+
+    python serve.py --app main
+    python serve.py --app simplearcos --workers 4 --worker-class gevent
+    ARCOS_WORKER_CLASS=sync ARCOS_WEB_WORKERS=9 python serve.py
+"""
+
+import argparse
+import importlib
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    raise SystemExit("❌ serve.py needs gunicorn: pip install gunicorn (plus gevent for --worker-class gevent)")
+
+import clients
+from metrics import registry as metrics
+
+# sync: one request per process; gthread: a thread pool per process, which
+# suits the I/O-bound OpenAI/Notion calls; gevent: cooperative greenlets
+WORKER_CLASSES = ["sync", "gthread", "gevent"]
+
+
+def default_workers():
+    return multiprocessing.cpu_count() * 2 + 1
+
+
+class ArcOSServer(BaseApplication):
+    """Gunicorn application that serves an already imported ArcOS module"""
+
+    def __init__(self, module, options, metrics_dir, own_metrics_dir=False):
+        self.module = module
+        self.options = options
+        self.queue_workers = None
+        self.metrics_dir = metrics_dir
+        self.own_metrics_dir = own_metrics_dir
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+        self.cfg.set("when_ready", self.when_ready)
+        self.cfg.set("post_worker_init", self.post_worker_init)
+        self.cfg.set("worker_exit", self.worker_exit)
+        self.cfg.set("on_exit", self.on_exit)
+
+    def load(self):
+        return self.module.app
+
+    def when_ready(self, server):
+        """Start the durable-queue workers (worker.py) alongside the web workers.
+
+        They run as a separate process rather than forks of the master, which
+        would inherit gunicorn's signal handlers and ignore SIGTERM.
+        """
+        queue_workers = self.queue_worker_count()
+        if queue_workers:
+            self.queue_workers = subprocess.Popen(
+                [sys.executable, "worker.py", "--app", self.module.__name__, "--workers", str(queue_workers)],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                env={**os.environ, "ARCOS_NOTION_SHARES": str(self.notion_shares())}
+            )
+
+    def queue_worker_count(self):
+        return int(os.getenv("ARCOS_WORKERS", 2)) if hasattr(self.module, "execute_job") else 0
+
+    def notion_shares(self):
+        """Processes calling Notion under one integration: web workers plus queue workers"""
+        return self.cfg.workers + self.queue_worker_count()
+
+    def post_worker_init(self, worker):
+        """Per-worker setup that must not be shared across the fork"""
+        module = self.module
+
+        # Each worker publishes its series; /metrics on any worker sums them all
+        metrics.enable_multiprocess(self.metrics_dir, float(os.getenv("ARCOS_METRICS_FLUSH_SECONDS", 5)))
+
+        # Notion's limit is per integration, so each process gets its share of rate and burst
+        writer = getattr(module, "notion_writer", None)
+        if writer:
+            writer.bucket.share(self.notion_shares())
+        inbound = getattr(module, "inbound_webhooks", None)
+        if inbound:
+            inbound.bucket.share(self.cfg.workers)
+
+        # Built here rather than in the master so no open connection is forked
+        clients.get_notion()
+        clients.get_openai()
+        module.schema_cache.warm(module.DATABASES)
+        payloads = getattr(module, "payloads", None)
+        if payloads:
+            payloads.warm(fields=getattr(module, "SIMPLE_FIELDS", None))
+
+        # Every worker runs the sync loop; a lease in the mirror file lets one sync at a time
+        mirror = getattr(module, "notion_mirror", None)
+        if mirror:
+            mirror.start()
+
+        # Any worker applies queued webhook updates, including ones left from before a restart
+        if inbound:
+            inbound.start()
+
+    def worker_exit(self, server, worker):
+        """Drain background work once gunicorn has finished in-flight requests"""
+        timeout = self.cfg.graceful_timeout
+        for name in ["pipeline", "inbound_webhooks", "notion_writer", "webhook_dispatcher"]:
+            component = getattr(self.module, name, None)
+            if component:
+                component.shutdown(timeout=timeout)
+        metrics.write_snapshot()
+
+    def on_exit(self, server):
+        if self.queue_workers:
+            self.queue_workers.terminate()
+            self.queue_workers.wait(timeout=self.cfg.graceful_timeout)
+        if self.own_metrics_dir:
+            shutil.rmtree(self.metrics_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ArcOS under gunicorn")
+    parser.add_argument("--app", choices=["main", "simplearcos"], default="main")
+    parser.add_argument("--bind", default=f"0.0.0.0:{os.getenv('PORT', 5000)}")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("ARCOS_WEB_WORKERS", default_workers())))
+    parser.add_argument("--worker-class", choices=WORKER_CLASSES,
+                        default=os.getenv("ARCOS_WORKER_CLASS", "gthread"))
+    parser.add_argument("--threads", type=int, default=int(os.getenv("ARCOS_THREADS", 8)),
+                        help="Threads per gthread worker")
+    parser.add_argument("--connections", type=int, default=int(os.getenv("ARCOS_WORKER_CONNECTIONS", 1000)),
+                        help="Concurrent greenlets per gevent worker")
+    parser.add_argument("--timeout", type=int, default=int(os.getenv("ARCOS_TIMEOUT", 120)))
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("ARCOS_GRACEFUL_TIMEOUT", 30)))
+    args = parser.parse_args()
+
+    if args.worker_class == "gevent":
+        from gevent import monkey
+        monkey.patch_all()
+
+    # Preload: the quarterback prompt, routing classifier and the slow-to-import
+    # SDK packages are loaded once here and shared copy-on-write by every forked
+    # worker. The clients hold connection pools, so each worker builds its own.
+    module = importlib.import_module(args.app)
+    for package in ("openai", "notion_client"):
+        importlib.import_module(package)
+
+    options = {
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": args.worker_class,
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+        "keepalive": 5,
+        "preload_app": True,
+        "accesslog": os.getenv("ARCOS_ACCESS_LOG", "-"),
+    }
+    if args.worker_class == "gthread":
+        options["threads"] = args.threads
+    elif args.worker_class == "gevent":
+        options["worker_connections"] = args.connections
+
+    # Shared with the queue workers through the environment; a fresh directory per run
+    metrics_dir = os.getenv("ARCOS_METRICS_DIR")
+    own_metrics_dir = not metrics_dir
+    if own_metrics_dir:
+        metrics_dir = os.environ["ARCOS_METRICS_DIR"] = tempfile.mkdtemp(prefix="arcos-metrics-")
+
+    print(f"🌐 Serving {args.app} on {args.bind}: {args.workers} x {args.worker_class} workers")
+    ArcOSServer(module, options, metrics_dir, own_metrics_dir).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,19 +6,34 @@ Simple Working ArcOS - Only uses basic properties that exist
 import os
 import json
 from flask import Flask, request, jsonify
-from notion_client import Client
-import openai
 from dotenv import load_dotenv
-import requests
 from datetime import datetime
 
+import clients
+from idempotency import IdempotencyStore, request_key
+from job_queue import JobQueue, QueueFull, WorkerPool
+from notion_mirror import NotionMirror
+from notion_payloads import PayloadRegistry
+from notion_schema import SchemaCache, is_schema_error
+from notion_scheduler import NotionWriteScheduler
+from http_pool import WebhookDispatcher
+from health_checks import DatabaseHealthMonitor
+
 load_dotenv()
 
 app = Flask(__name__)
 
-# Initialize services
-notion = Client(auth=os.getenv("NOTION_API_KEY"))
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# Initialize services (shared pooled client, built on first use)
+notion = clients.notion
+
+# All Notion writes are paced through one rate-limited queue
+notion_writer = NotionWriteScheduler(notion, rate=float(os.getenv("NOTION_RATE_LIMIT", 3)))
+
+# Make.com webhooks are delivered in the background over a pooled session
+webhook_dispatcher = WebhookDispatcher(
+    concurrency=int(os.getenv("ARCOS_WEBHOOK_CONCURRENCY", 4)),
+    dead_letter_path=os.getenv("ARCOS_WEBHOOK_DEAD_LETTER", "webhook_dead_letter.jsonl")
+)
 
 # Database IDs
 DATABASES = {
@@ -29,6 +44,32 @@ DATABASES = {
     'training': os.getenv("TRAINING_DB_ID")
 }
 
+# Local copy of the pillar databases, shared with main.py: created pages are
+# written through, edits made in Notion are picked up by the periodic sync
+notion_mirror = NotionMirror(
+    notion, DATABASES,
+    db_path=os.getenv("ARCOS_MIRROR_DB", "arcos_mirror.db"),
+    sync_interval=int(os.getenv("ARCOS_MIRROR_SYNC_INTERVAL", 60)),
+    scheduler=notion_writer
+)
+
+# Database connectivity for /status, cached for ARCOS_STATUS_TTL seconds
+db_health = DatabaseHealthMonitor(notion, DATABASES, ttl=int(os.getenv("ARCOS_STATUS_TTL", 30)))
+
+# Database schemas, warmed at startup and used to drop unknown properties
+schema_cache = SchemaCache(notion, ttl=int(os.getenv("ARCOS_SCHEMA_TTL", 300)))
+
+# Shared per-pillar templates, limited to the properties every database should have:
+# Title everywhere, plus Status on the databases known to have one
+payloads = PayloadRegistry(schema_cache, DATABASES)
+SIMPLE_FIELDS = {
+    "content": ("Title", "Status"),
+    "tasks": ("Title", "Status"),
+    "health": ("Title",),
+    "finance": ("Title",),
+    "training": ("Title",),
+}
+
 
 class SimpleQuarterback:
     """Simplified QB that only uses basic properties"""
@@ -77,6 +118,17 @@ class SimpleQuarterback:
 
 quarterback = SimpleQuarterback()
 
+# Durable queue + worker pool for /command/queue
+QUEUE_DB = os.getenv("SIMPLE_ARCOS_QUEUE_DB", "simple_arcos_queue.db")
+job_queue = JobQueue(QUEUE_DB, max_depth=int(os.getenv("ARCOS_QUEUE_MAX_DEPTH", 1000)))
+
+# Results of recent /command calls, replayed to retries
+idempotency = IdempotencyStore(
+    os.getenv("SIMPLE_ARCOS_IDEMPOTENCY_DB", "simple_arcos_idempotency.db"),
+    key_ttl=int(os.getenv("ARCOS_IDEMPOTENCY_TTL", 86400)),
+    hash_ttl=int(os.getenv("ARCOS_DEDUPE_WINDOW", 600))
+)
+
 
 def create_simple_notion_task(pillar, title):
     """Create task with ONLY Title - the most basic approach"""
@@ -85,30 +137,69 @@ def create_simple_notion_task(pillar, title):
         if not db_id:
             return {"error": f"Database not configured for {pillar}"}
 
-        # ONLY use Title - the one property that should always work
-        properties = {
-            "Title": {"title": [{"text": {"content": title}}]}
-        }
-
-        # Try to add Status if it's a known working database
-        if pillar in ['content', 'tasks']:
-            if pillar == 'content':
-                properties["Status"] = {"select": {"name": "Idea"}}
-            elif pillar == 'tasks':
-                properties["Status"] = {"select": {"name": "New"}}
-
-        response = notion.pages.create(
+        # Title (plus Status for content/tasks), and only where the database actually has them
+        response = notion_writer.create_page(
             parent={"database_id": db_id},
-            properties=properties
+            properties=payloads.build(pillar, title, {}, fields=SIMPLE_FIELDS.get(pillar, ("Title",)))
         )
+        notion_mirror.record(response)
 
         return {"success": True, "page_id": response["id"], "url": response["url"]}
 
     except Exception as e:
         print(f"Notion error: {e}")
+        if is_schema_error(e):
+            schema_cache.invalidate(DATABASES.get(pillar))
         return {"error": str(e)}
 
 
+def execute_command(command):
+    """Run a command through QB -> Notion -> Make.com and return the result"""
+    print(f"Processing: {command}")
+
+    # QB analyzes the command
+    analysis = quarterback.analyze_command(command)
+    print(f"QB Analysis: {analysis}")
+
+    # Create task with minimal properties
+    pillar = analysis.get('pillar', 'tasks')
+    title = analysis.get('title', command)
+
+    notion_result = create_simple_notion_task(pillar, title)
+
+    # Trigger automation if needed
+    automation_result = None
+    if analysis.get('automation', False):
+        webhook_url = os.getenv("MAKE_WEBHOOK_URL")
+        if webhook_url:
+            try:
+                payload = {
+                    "source": "simple_arcos",
+                    "pillar": pillar,
+                    "action": analysis.get('action'),
+                    "page_id": notion_result.get('page_id'),
+                    "title": title,
+                    "timestamp": datetime.now().isoformat()
+                }
+                delivery_id = webhook_dispatcher.dispatch(webhook_url, payload)
+                automation_result = {"success": True, "queued": True, "delivery_id": delivery_id}
+            except Exception as e:
+                automation_result = {"error": str(e)}
+
+    return {
+        "success": True,
+        "command": command,
+        "quarterback_analysis": analysis,
+        "notion_result": notion_result,
+        "automation_result": automation_result
+    }
+
+
+def execute_job(payload):
+    """Queue worker entry point"""
+    return execute_command(payload["command"])
+
+
 @app.route('/command', methods=['POST'])
 def process_command():
     """Simplified command processing"""
@@ -119,50 +210,58 @@ def process_command():
         if not command:
             return jsonify({"error": "Command required"}), 400
 
-        print(f"Processing: {command}")
-
-        # QB analyzes the command
-        analysis = quarterback.analyze_command(command)
-        print(f"QB Analysis: {analysis}")
-
-        # Create task with minimal properties
-        pillar = analysis.get('pillar', 'tasks')
-        title = analysis.get('title', command)
-
-        notion_result = create_simple_notion_task(pillar, title)
-
-        # Trigger automation if needed
-        automation_result = None
-        if analysis.get('automation', False):
-            webhook_url = os.getenv("MAKE_WEBHOOK_URL")
-            if webhook_url:
-                try:
-                    payload = {
-                        "source": "simple_arcos",
-                        "pillar": pillar,
-                        "action": analysis.get('action'),
-                        "page_id": notion_result.get('page_id'),
-                        "title": title,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    response = requests.post(webhook_url, json=payload, timeout=10)
-                    automation_result = {"success": response.status_code == 200}
-                except Exception as e:
-                    automation_result = {"error": str(e)}
+        # A retry (same Idempotency-Key, or the same command within the
+        # dedupe window) gets the original result without re-running anything
+        key, kind = request_key(request.headers.get('Idempotency-Key') or data.get('idempotency_key'), command)
+        result, replayed = idempotency.run(key, kind, lambda: execute_command(command),
+                                           cacheable=lambda r: not r["notion_result"].get("error"))
+        return jsonify(result), 200, {"Idempotent-Replayed": "true" if replayed else "false"}
+
+    except TimeoutError as e:
+        return jsonify({"error": str(e)}), 409, {"Retry-After": "5"}
+
+    except Exception as e:
+        print(f"Command error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/command/queue', methods=['POST'])
+def enqueue_command():
+    """Durably queue a command for the worker pool"""
+    try:
+        data = request.json
+        command = data.get('command')
+
+        if not command:
+            return jsonify({"error": "Command required"}), 400
+
+        idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+        job, created = job_queue.enqueue({"command": command}, idempotency_key)
 
         return jsonify({
             "success": True,
-            "command": command,
-            "quarterback_analysis": analysis,
-            "notion_result": notion_result,
-            "automation_result": automation_result
-        })
+            "job_id": job["id"],
+            "status": job["status"],
+            "duplicate": not created
+        }), 202 if created else 200
+
+    except QueueFull as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": "5"}
 
     except Exception as e:
         print(f"Command error: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/queue/<job_id>', methods=['GET'])
+def queued_job_status(job_id):
+    """Poll the status of a queued command"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+
 @app.route('/status', methods=['GET'])
 def system_status():
     """Check which databases actually work"""
@@ -171,21 +270,26 @@ def system_status():
         "databases": {}
     }
 
-    # Test each database with a simple Title-only creation
-    for pillar, db_id in DATABASES.items():
-        if db_id:
-            try:
-                # Just check if we can retrieve the database
-                notion.databases.retrieve(db_id)
-                status["databases"][pillar] = "Connected"
-            except Exception as e:
-                status["databases"][pillar] = f"Error: {str(e)[:50]}"
-        else:
-            status["databases"][pillar] = "Not Configured"
+    # Check databases (cached, refreshed concurrently in the background)
+    status["databases"], status["databases_checked_seconds_ago"] = db_health.status()
+
+    status["queue"] = job_queue.metrics()
+    status["idempotency"] = idempotency.stats()
+    status["connection_pools"] = clients.stats()
+    status["schema_cache"] = schema_cache.stats()
+    status["notion_writer"] = notion_writer.stats()
+    status["webhooks"] = webhook_dispatcher.stats()
+    status["mirror"] = notion_mirror.stats()
 
     return jsonify(status)
 
 
+@app.route('/healthz', methods=['GET'])
+def liveness():
+    """Cheap liveness probe - never touches external services"""
+    return jsonify({"status": "ok"})
+
+
 @app.route('/', methods=['GET'])
 def home():
     return """
@@ -211,4 +315,17 @@ Invoke-RestMethod -Uri "http://localhost:5000/command" -Method POST -ContentType
 if __name__ == '__main__':
     print("Simple ArcOS Starting...")
     print("This version uses minimal properties to ensure compatibility")
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+
+    # Development server only; use serve.py in production
+    debug = os.getenv("ARCOS_DEBUG", "1") == "1"
+
+    # The debug reloader runs this block twice; only the serving child starts workers.
+    # The pool forks, so it starts before any background thread or connection exists.
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        WorkerPool(QUEUE_DB, execute_job, workers=int(os.getenv("ARCOS_WORKERS", 2))).start()
+
+        schema_cache.warm(DATABASES)
+        payloads.warm(fields=SIMPLE_FIELDS)
+        notion_mirror.start()
+
+    app.run(host='0.0.0.0', port=int(os.getenv('PORT', 5000)), debug=debug)
\ No newline at end of file
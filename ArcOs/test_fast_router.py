@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Fast router tests: inflected commands route like their base forms
+"""
+
+import pytest
+
+from fast_router import KeywordClassifier
+
+classifier = KeywordClassifier()
+
+
+@pytest.mark.parametrize("command, pillar", [
+    ("Learning Spanish", "training"),
+    ("Studying for exam", "training"),
+    ("Practising piano scales", "training"),
+    ("Log 3 workouts", "health"),
+    ("Exercised after work", "health"),
+    ("Walked to the office", "health"),
+    ("Buying groceries", "finance"),
+    ("Reviewing costs", "finance"),
+    ("Budgeting for May", "finance"),
+    ("Writing the launch announcement", "content"),
+    ("Drafted two blogs", "content"),
+])
+def test_inflected_forms(command, pillar):
+    analysis, confidence = classifier.classify(command)
+    assert analysis["pillar"] == pillar
+    assert confidence > 0
+
+
+@pytest.mark.parametrize("command", ["Call mom", "Postpone dentist", "Brunch with Sam", "Arrange a random meeting"])
+def test_stems_do_not_match_inside_other_words(command):
+    analysis, confidence = classifier.classify(command)
+    assert analysis["pillar"] == "tasks"
+    assert confidence == 0.0
@@ -5,13 +5,12 @@ Tests Notion, OpenAI, and Make.com connections
 """
 
 import os
-import requests
 import json
-from notion_client import Client
-import openai
 from dotenv import load_dotenv
 from datetime import datetime
 
+from clients import get_http_session, notion, openai_client
+
 load_dotenv()
 
 
@@ -20,8 +19,6 @@ def test_notion():
     print("🔵 Testing Notion...")
 
     try:
-        notion = Client(auth=os.getenv("NOTION_API_KEY"))
-
         # Test 1: Create a simple page
         response = notion.pages.create(
             parent={"database_id": os.getenv("TEST_DATABASE_ID")},
@@ -55,9 +52,7 @@ def test_openai():
     print("\n🟢 Testing OpenAI...")
 
     try:
-        openai.api_key = os.getenv("OPENAI_API_KEY")
-
-        response = openai.chat.completions.create(
+        response = openai_client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "user", "content": "Write one sentence about automation."}
@@ -94,7 +89,7 @@ def test_make_webhook():
             "source": "integration_test"
         }
 
-        response = requests.post(webhook_url, json=test_data, timeout=10)
+        response = get_http_session().post(webhook_url, json=test_data, timeout=10)
 
         if response.status_code == 200:
             print(f"✅ Make.com: Webhook responded {response.status_code}")
@@ -136,7 +131,7 @@ def test_full_workflow():
                 "timestamp": datetime.now().isoformat()
             }
 
-            response = requests.post(webhook_url, json=workflow_data, timeout=10)
+            response = get_http_session().post(webhook_url, json=workflow_data, timeout=10)
 
             if response.status_code == 200:
                 print("✅ Complete workflow successful!")
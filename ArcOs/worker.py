@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+ArcOS Worker
+Runs queue workers separately from the web server, e.g.
+
+    python worker.py --app main --workers 4
+    python worker.py --app simplearcos --workers 2
+"""
+
+import argparse
+import importlib
+import os
+import signal
+import time
+
+from job_queue import WorkerPool
+from metrics import registry as metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ArcOS queue workers")
+    parser.add_argument("--app", default="main", help="Module that defines execute_job and QUEUE_DB")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("ARCOS_WORKERS", 2)))
+    args = parser.parse_args()
+
+    app_module = importlib.import_module(args.app)
+    if os.getenv("ARCOS_METRICS_DIR"):
+        # Set by serve.py so the web workers' /metrics includes queue work
+        metrics.enable_multiprocess(os.environ["ARCOS_METRICS_DIR"], float(os.getenv("ARCOS_METRICS_FLUSH_SECONDS", 5)))
+    writer = getattr(app_module, "notion_writer", None)
+    if writer:
+        # serve.py counts its web workers too; run standalone, these workers split the limit
+        writer.bucket.share(int(os.getenv("ARCOS_NOTION_SHARES", args.workers)))
+    pool = WorkerPool(app_module.QUEUE_DB, app_module.execute_job, workers=args.workers)
+    pool.start()
+    print(f"🚀 {args.workers} workers running for {args.app} ({app_module.QUEUE_DB})")
+
+    def stop(signum, frame):
+        pool.stop()
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while True:
+        time.sleep(5)
+        if pool.alive() < args.workers:
+            print(f"⚠️  {args.workers - pool.alive()} workers exited")
+
+
+if __name__ == "__main__":
+    main()